@@ -0,0 +1,55 @@
+"""Measures converting many values against a large list of choices.
+
+A command with a ``multiple=True`` option of type :class:`click.Choice`
+is invoked with VALUES values picked from CHOICES choices.  The values
+are given in upper case, so without ``--exact`` every value has to go
+through the token normalization function and the case insensitive
+lookup.
+"""
+import timeit
+
+import click
+
+
+def make_command(choices, exact):
+    context_settings = {}
+    if not exact:
+        context_settings['token_normalize_func'] = lambda x: x.strip()
+
+    @click.command(context_settings=context_settings)
+    @click.option('--item', 'items', multiple=True,
+                  type=click.Choice(choices, case_sensitive=exact))
+    def cli(items):
+        return len(items)
+
+    return cli
+
+
+@click.command()
+@click.option('--choices', default=5000, show_default=True,
+              help='The number of choices.')
+@click.option('--values', default=5000, show_default=True,
+              help='The number of values passed to the option.')
+@click.option('--exact', is_flag=True,
+              help='Pass the choices as they are.')
+@click.option('--repeat', default=3, show_default=True,
+              help='Report the best of this many runs.')
+def main(choices, values, exact, repeat):
+    """Reports the time of one invocation."""
+    names = ['choice_%06d' % i for i in range(choices)]
+    args = []
+    for i in range(values):
+        value = names[i * 7919 % choices]
+        args.extend(['--item', value if exact else value.upper()])
+    cli = make_command(names, exact)
+
+    def run():
+        assert cli.main(args, standalone_mode=False) == values
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    click.echo('%d values, %d choices: %.3f s (%.2f us per value)' % (
+        values, choices, best, best * 1e6 / values))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Measures converting a column of timestamps with :class:`click.DateTime`.
+
+A command with a ``nargs=-1`` argument of type :class:`click.DateTime`
+is invoked with VALUES timestamps.  ``--style iso`` passes ISO 8601
+timestamps in the default formats, ``--style custom`` passes timestamps
+that only match the last of several custom formats.  Custom formats
+might overlap, so they are always tried in the given order.
+"""
+import datetime
+import timeit
+
+import click
+
+
+STYLES = {
+    'iso': (None, '%Y-%m-%d %H:%M:%S'),
+    'custom': (['%Y/%m/%d', '%d.%m.%Y', '%m/%d/%Y %H:%M'], '%m/%d/%Y %H:%M'),
+}
+
+
+@click.command()
+@click.option('--values', default=100000, show_default=True,
+              help='The number of timestamps.')
+@click.option('--style', type=click.Choice(sorted(STYLES)), default='iso',
+              show_default=True, help='The format of the timestamps.')
+@click.option('--repeat', default=3, show_default=True,
+              help='Report the best of this many runs.')
+def main(values, style, repeat):
+    """Reports the time of one invocation."""
+    formats, value_format = STYLES[style]
+    start = datetime.datetime(2019, 1, 1)
+    step = datetime.timedelta(minutes=7)
+    args = [(start + i * step).strftime(value_format) for i in range(values)]
+
+    @click.command()
+    @click.argument('stamps', nargs=-1, type=click.DateTime(formats))
+    def cli(stamps):
+        return len(stamps)
+
+    def run():
+        assert cli.main(args, standalone_mode=False) == values
+
+    best = min(timeit.repeat(run, number=1, repeat=repeat))
+    click.echo('%d %s values: %.3f s (%.2f us per value)' % (
+        values, style, best, best * 1e6 / values))
+
+
+if __name__ == '__main__':
+    main()
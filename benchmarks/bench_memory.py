@@ -0,0 +1,73 @@
+"""Measures the memory used by a large command tree.
+
+A group with COMMANDS subcommands of PARAMS parameters each is built,
+then a context and a parser are made for every subcommand.  The memory
+traced by tracemalloc is reported for both steps.  Run the script on
+two checkouts to compare them.
+"""
+import gc
+import tracemalloc
+
+import click
+
+
+def build_tree(commands, params):
+    cli = click.Group('cli')
+    for i in range(commands):
+        cmd_params = []
+        for j in range(params):
+            if j % 4 == 3:
+                cmd_params.append(click.Argument(['arg_%d' % j],
+                                                 required=False))
+            else:
+                cmd_params.append(click.Option(['--opt-%d' % j], type=int,
+                                               default=j,
+                                               help='Option %d.' % j))
+        cli.add_command(click.Command('cmd-%d' % i, params=cmd_params))
+    return cli
+
+
+def make_parsers(cli):
+    ctx = click.Context(cli, info_name='cli')
+    rv = []
+    for name in cli.list_commands(ctx):
+        cmd = cli.get_command(ctx, name)
+        sub_ctx = click.Context(cmd, info_name=name, parent=ctx)
+        rv.append((sub_ctx, cmd.make_parser(sub_ctx)))
+    return rv
+
+
+def measure(func, *args):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rv = func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return rv, current, peak
+
+
+def report(label, current, peak, count):
+    click.echo('%-8s %8.1f MB retained %8.1f MB peak %6d bytes each' % (
+        label, current / 1e6, peak / 1e6, current // count))
+
+
+@click.command()
+@click.option('--commands', default=1000, show_default=True,
+              help='The number of subcommands.')
+@click.option('--params', default=20, show_default=True,
+              help='The number of parameters of every subcommand.')
+def main(commands, params):
+    """Reports the memory of a command tree and of the contexts and
+    parsers made for it.
+    """
+    total = commands * params
+    cli, current, peak = measure(build_tree, commands, params)
+    report('tree', current, peak, total)
+    parsers, current, peak = measure(make_parsers, cli)
+    report('parsers', current, peak, total)
+
+
+if __name__ == '__main__':
+    main()
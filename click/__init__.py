@@ -14,7 +14,8 @@ composable.
 
 # Core classes
 from .core import Context, BaseCommand, Command, MultiCommand, Group, \
-     CommandCollection, Parameter, Option, Argument, ParameterSource
+     CommandCollection, Parameter, Option, Argument, ParameterSource, \
+     DeferredValue
 
 # Globals
 from .globals import get_current_context
@@ -26,17 +27,23 @@ from .decorators import pass_context, pass_obj, make_pass_decorator, \
 
 # Types
 from .types import ParamType, File, Path, Choice, IntRange, Tuple, \
-     DateTime, STRING, INT, FLOAT, BOOL, UUID, UNPROCESSED, FloatRange
+     DateTime, STRING, INT, FLOAT, BOOL, UUID, UNPROCESSED, FloatRange, \
+     Array
 
 # Utilities
 from .utils import echo, get_binary_stream, get_text_stream, open_file, \
-     format_filename, get_app_dir, get_os_args
+     format_filename, get_app_dir, get_os_args, copy_stream, \
+     iter_line_chunks, cached_default, ConfigDefaultMap
 
 # Terminal functions
 from .termui import prompt, confirm, get_terminal_size, echo_via_pager, \
      progressbar, clear, style, unstyle, secho, edit, launch, getchar, \
      pause
 
+# Pipelines
+from .pipeline import PipelineStage, processor, generator, mapper, \
+     run_pipeline
+
 # Exceptions
 from .exceptions import ClickException, UsageError, BadParameter, \
      FileError, Abort, NoSuchOption, BadOptionUsage, BadArgumentUsage, \
@@ -52,7 +59,7 @@ from .parser import OptionParser
 __all__ = [
     # Core classes
     'Context', 'BaseCommand', 'Command', 'MultiCommand', 'Group',
-    'CommandCollection', 'Parameter', 'Option', 'Argument',
+    'CommandCollection', 'Parameter', 'Option', 'Argument', 'DeferredValue',
 
     # Globals
     'get_current_context',
@@ -65,17 +72,21 @@ __all__ = [
     # Types
     'ParamType', 'File', 'Path', 'Choice', 'IntRange', 'Tuple',
     'DateTime', 'STRING', 'INT', 'FLOAT', 'BOOL', 'UUID', 'UNPROCESSED',
-    'FloatRange',
+    'FloatRange', 'Array',
 
     # Utilities
     'echo', 'get_binary_stream', 'get_text_stream', 'open_file',
-    'format_filename', 'get_app_dir', 'get_os_args',
+    'format_filename', 'get_app_dir', 'get_os_args', 'copy_stream',
+    'iter_line_chunks', 'cached_default', 'ConfigDefaultMap',
 
     # Terminal functions
     'prompt', 'confirm', 'get_terminal_size', 'echo_via_pager',
     'progressbar', 'clear', 'style', 'unstyle', 'secho', 'edit', 'launch',
     'getchar', 'pause',
 
+    # Pipelines
+    'PipelineStage', 'processor', 'generator', 'mapper', 'run_pipeline',
+
     # Exceptions
     'ClickException', 'UsageError', 'BadParameter', 'FileError',
     'Abort', 'NoSuchOption', 'BadOptionUsage', 'BadArgumentUsage',
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+click._asyncsupport
+~~~~~~~~~~~~~~~~~~~
+
+Runs the awaitables returned by callbacks.  This module uses the async
+syntax of Python 3.5 and is only imported once a callback returns an
+awaitable or :meth:`BaseCommand.main_async` is called.
+"""
+import asyncio
+import threading
+import types
+from functools import partial
+
+from ._compat import isawaitable
+from .globals import push_context, pop_context
+
+
+_local = threading.local()
+_runner_lock = threading.Lock()
+
+
+@types.coroutine
+def _with_context(ctx, awaitable):
+    # The context stack is thread local and other tasks may run on the
+    # loop between the steps, so the context is pushed for every step.
+    it = awaitable.__await__()
+    send, message = it.send, None
+    while True:
+        push_context(ctx)
+        try:
+            yielded = send(message)
+        except StopIteration as e:
+            return e.value
+        finally:
+            pop_context()
+        try:
+            message = yield yielded
+            send = it.send
+        except GeneratorExit:
+            it.close()
+            raise
+        except BaseException as e:
+            message = e
+            send = it.throw
+
+
+async def _run_in_context(ctx, awaitable):
+    return await _with_context(ctx, awaitable)
+
+
+def _invoke_in_context(ctx, awaitable):
+    # Mirrors ``with ctx:`` in :meth:`Context.invoke` for awaitables that
+    # are awaited by the caller.  The context is entered right away, the
+    # ``with`` block in ``invoke`` is left before the caller awaits and
+    # must not close the context (and the files opened for it) early.
+    ctx._depth += 1
+    return _await_and_close(ctx, awaitable)
+
+
+async def _await_and_close(ctx, awaitable):
+    try:
+        return await _with_context(ctx, awaitable)
+    finally:
+        ctx._depth -= 1
+        if ctx._depth == 0:
+            callbacks, ctx._close_callbacks = ctx._close_callbacks, []
+            for cb in callbacks:
+                rv = cb()
+                if isawaitable(rv):
+                    await _with_context(ctx, rv)
+
+
+if hasattr(asyncio, 'get_running_loop'):
+    def _running_loop():
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+else:
+    # Python 3.5 and 3.6 have no public way to ask for the loop that
+    # runs in the current thread.
+    _running_loop = asyncio._get_running_loop
+
+
+class EventLoopRunner(object):
+    """Runs the awaitables of an invocation on one event loop.  Without a
+    `loop` a private loop is created on first use and closed with the
+    root context.  Awaitables from other threads (the workers of a
+    concurrent chain) are run on the loop from a background thread.
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._owns_loop = loop is None
+        self._owner = threading.current_thread()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+            return self._loop
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._owns_loop and self._thread is None:
+                self._thread = threading.Thread(target=self._loop.run_forever)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def run(self, ctx, awaitable):
+        # Called from a coroutine, on this loop or on a loop the caller
+        # runs itself (``asyncio.run`` in a sync callback), the caller
+        # has to await it.
+        if _running_loop() is not None:
+            return _invoke_in_context(ctx, awaitable)
+        return self._run_blocking(ctx, awaitable)
+
+    def run_close_callback(self, ctx, awaitable):
+        """Runs the awaitable returned by a close callback.  A running
+        loop in this thread cannot be blocked, so the callback is
+        scheduled as a task on it.
+        """
+        loop = _running_loop()
+        if loop is not None:
+            loop.create_task(_run_in_context(ctx, awaitable))
+        else:
+            self._run_blocking(ctx, awaitable)
+
+    def _run_blocking(self, ctx, awaitable):
+        loop = self.loop
+        if threading.current_thread() is self._owner \
+           and not loop.is_running():
+            return loop.run_until_complete(_run_in_context(ctx, awaitable))
+        self._ensure_running()
+        return asyncio.run_coroutine_threadsafe(
+            _run_in_context(ctx, awaitable), loop).result()
+
+    def close(self):
+        loop = self._loop
+        if loop is None or not self._owns_loop:
+            return
+        if self._thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            self._thread.join()
+            self._thread = None
+        shutdown_asyncgens = getattr(loop, 'shutdown_asyncgens', None)
+        if shutdown_asyncgens is not None:
+            loop.run_until_complete(shutdown_asyncgens())
+        loop.close()
+
+
+def get_runner(root):
+    """Returns the runner of a root context and creates it if needed."""
+    with _runner_lock:
+        if root._async_runner is None:
+            root._async_runner = getattr(_local, 'runner', None) \
+                or EventLoopRunner()
+        return root._async_runner
+
+
+def _main_in_thread(runner, command, args, kwargs):
+    _local.runner = runner
+    try:
+        return command.main(*args, **kwargs)
+    finally:
+        del _local.runner
+
+
+async def main_async(command, args, kwargs):
+    loop = asyncio.get_event_loop()
+    runner = EventLoopRunner(loop)
+    return await loop.run_in_executor(None, partial(
+        _main_in_thread, runner, command, args, kwargs))
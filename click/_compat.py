@@ -18,10 +18,23 @@ DEFAULT_COLUMNS = 80
 _ansi_re = re.compile(r'\033\[((?:\d|;)*)([a-zA-Z])')
 
 
+try:
+    from inspect import isawaitable
+except ImportError:
+    def isawaitable(obj):
+        return False
+
+
 def get_filesystem_encoding():
     return sys.getfilesystemencoding() or sys.getdefaultencoding()
 
 
+def get_unbound_function(method):
+    # Functions looked up on a class are unbound methods on Python 2.
+    # Comparing the functions tells if a subclass overrides a method.
+    return getattr(method, '__func__', method)
+
+
 def _make_text_stream(stream, encoding, errors,
                       force_readable=False, force_writable=False):
     if encoding is None:
@@ -466,8 +479,247 @@ def get_streerror(e, default=None):
     return msg
 
 
+# The gzip magic includes the deflate method and the bz2 magic the block
+# size digit, so that text starting with "BZh" is not taken for bz2.
+_compression_magic = [
+    (b'\x1f\x8b\x08', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+] + [(('BZh%d' % i).encode('ascii'), 'bz2') for i in range(1, 10)]
+
+_compression_extensions = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz',
+}
+
+
+def _get_compressor(compression):
+    if compression == 'gzip':
+        import gzip
+        return lambda f, mode: gzip.GzipFile(filename='', mode=mode,
+                                             fileobj=f)
+    # The Python 2 modules can only work with file names, not streams.
+    if compression == 'bz2' and not PY2:
+        import bz2
+        return bz2.BZ2File
+    if compression == 'xz' and not PY2:
+        import lzma
+        return lzma.LZMAFile
+    raise ValueError('Unsupported compression %r' % compression)
+
+
+def _detect_compression(f):
+    """Detects the compression of a binary stream by its magic bytes
+    without consuming them.  Returns `None` for uncompressed streams or
+    if the stream cannot be inspected without consuming it.
+    """
+    size = max(len(magic) for magic, _ in _compression_magic)
+    peek = getattr(f, 'peek', None)
+    if peek is not None:
+        head = peek(size)[:size]
+    else:
+        try:
+            pos = f.tell()
+            head = f.read(size)
+            f.seek(pos)
+        except (AttributeError, IOError, OSError):
+            return None
+    for magic, compression in _compression_magic:
+        if head.startswith(magic):
+            return compression
+
+
+def _compression_from_filename(filename):
+    if filename == '-':
+        return None
+    if isinstance(filename, bytes):
+        filename = filename.decode(get_filesystem_encoding(), 'replace')
+    ext = os.path.splitext(filename)[1].lower()
+    return _compression_extensions.get(ext)
+
+
+def _open_compressed_stream(filename, mode, encoding, errors, atomic,
+                            compression, buffering=-1, fsync=False):
+    if '+' in mode:
+        raise ValueError('Compressed files cannot be opened for updating.')
+    writing = any(m in mode for m in ['w', 'a', 'x'])
+    binary_mode = ''.join(m for m in mode if m in 'rwax') + 'b'
+    # Read streams are checked for their magic bytes.
+    detected = not writing and compression == 'auto'
+
+    if writing:
+        if compression == 'auto':
+            compression = _compression_from_filename(filename)
+        if compression is None:
+            return open_stream(filename, mode, encoding, errors, atomic,
+                               buffering=buffering, fsync=fsync)
+        compressor = _get_compressor(compression)
+        if filename == '-':
+            f = get_binary_stdout()
+        else:
+            f = open_stream(filename, binary_mode, atomic=atomic,
+                            buffering=buffering, fsync=fsync)[0]
+    else:
+        if filename == '-':
+            f = get_binary_stdin()
+        else:
+            f = open(filename, 'rb', buffering)
+        if detected:
+            compression = _detect_compression(f)
+        if compression is None:
+            if filename != '-':
+                f.close()
+            return open_stream(filename, mode, encoding, errors,
+                               buffering=buffering)
+        try:
+            compressor = _get_compressor(compression)
+        except ValueError:
+            if filename != '-':
+                f.close()
+            raise
+
+    try:
+        rv = compressor(f, binary_mode)
+        if detected and filename != '-':
+            # Decompressors only fail on the first read.  Files that only
+            # look compressed are opened as they are.
+            rv.peek(1)
+    except Exception:
+        if filename != '-':
+            f.close()
+        if not detected or filename == '-':
+            raise
+        return open_stream(filename, mode, encoding, errors,
+                           buffering=buffering)
+    if 'b' not in mode:
+        rv = io.TextIOWrapper(rv, encoding, errors)
+    return _CompressedFile(rv, filename, filename != '-' and f or None), True
+
+
+class _PrefetchReader(io.RawIOBase):
+    """Reads chunks of a binary file on a background thread into a queue
+    of at most `chunks` entries, so that reading overlaps with whatever
+    the consumer does with the data.
+    """
+
+    def __init__(self, f, chunks, chunk_size, close_source=True):
+        import threading
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+        self._f = f
+        self._chunk_size = chunk_size
+        self._close_source = close_source
+        self._queue = queue.Queue(chunks)
+        self._full = queue.Full
+        self._empty = queue.Empty
+        self._stop = threading.Event()
+        self._chunk = b''
+        self._pos = 0
+        self._eof = False
+        self._thread = threading.Thread(target=self._fill)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def name(self):
+        return getattr(self._f, 'name', None)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except self._full:
+                pass
+
+    def _fill(self):
+        try:
+            while not self._stop.is_set():
+                chunk = self._f.read(self._chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._pos >= len(self._chunk):
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk = item
+            self._pos = 0
+        n = min(len(b), len(self._chunk) - self._pos)
+        b[:n] = self._chunk[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        self._stop.set()
+        # Unblock the thread if it waits for room in the queue.
+        while True:
+            try:
+                self._queue.get_nowait()
+            except self._empty:
+                break
+        # Standard streams are left alone, the thread might be blocked
+        # reading from them.
+        if self._close_source:
+            self._thread.join()
+            self._f.close()
+        io.RawIOBase.close(self)
+
+
+#: the size of the chunks read ahead if no buffer size is given.
+_prefetch_chunk_size = 64 * 1024
+
+
+def _open_prefetching(filename, mode, encoding, errors, compression,
+                      buffering, prefetch):
+    f, should_close = open_stream(filename, 'rb',
+                                  compression=compression,
+                                  buffering=buffering)
+    chunk_size = buffering if buffering > 1 else _prefetch_chunk_size
+    rv = io.BufferedReader(_PrefetchReader(f, prefetch, chunk_size,
+                                           close_source=should_close),
+                           chunk_size)
+    if 'b' not in mode:
+        rv = io.TextIOWrapper(rv, encoding, errors)
+    return rv, True
+
+
 def open_stream(filename, mode='r', encoding=None, errors='strict',
-                atomic=False):
+                atomic=False, compression=None, buffering=-1, fsync=False,
+                prefetch=0):
+    # Files read ahead on a background thread are wrapped around the
+    # binary (and possibly decompressing) stream.
+    if prefetch:
+        if any(m in mode for m in 'wax+'):
+            raise ValueError('Prefetching is only supported for files '
+                             'opened for reading.')
+        return _open_prefetching(filename, mode, encoding, errors,
+                                 compression, buffering, prefetch)
+
+    # Compressed streams are opened as binary streams which are then
+    # wrapped in the decompressing or compressing file object.
+    if compression is not None:
+        return _open_compressed_stream(filename, mode, encoding, errors,
+                                       atomic, compression, buffering, fsync)
+
     # Standard streams first.  These are simple because they don't need
     # special handling for the atomic flag.  It's entirely ignored.
     if filename == '-':
@@ -481,9 +733,13 @@ def open_stream(filename, mode='r', encoding=None, errors='strict',
 
     # Non-atomic writes directly go out through the regular open functions.
     if not atomic:
+        if fsync:
+            raise ValueError('Syncing to disk is only supported for atomic '
+                             'writes.')
         if encoding is None:
-            return open(filename, mode), True
-        return io.open(filename, mode, encoding=encoding, errors=errors), True
+            return open(filename, mode, buffering), True
+        return io.open(filename, mode, buffering, encoding=encoding,
+                       errors=errors), True
 
     # Some usability stuff for atomic writes
     if 'a' in mode:
@@ -507,11 +763,12 @@ def open_stream(filename, mode='r', encoding=None, errors='strict',
                                         prefix='.__atomic-write')
 
     if encoding is not None:
-        f = io.open(fd, mode, encoding=encoding, errors=errors)
+        f = io.open(fd, mode, buffering, encoding=encoding, errors=errors)
     else:
-        f = os.fdopen(fd, mode)
+        f = os.fdopen(fd, mode, buffering)
 
-    return _AtomicFile(f, tmp_filename, os.path.realpath(filename)), True
+    return _AtomicFile(f, tmp_filename, os.path.realpath(filename),
+                       fsync), True
 
 
 # Used in a destructor call, needs extra protection from interpreter cleanup.
@@ -523,12 +780,33 @@ else:
     _can_replace = not WIN
 
 
+def _fsync_dir(path):
+    # Makes a rename in the directory durable.  Directories cannot be
+    # opened on Windows and some filesystems refuse to sync them, which
+    # is not worth failing over.
+    if WIN:
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
 class _AtomicFile(object):
 
-    def __init__(self, f, tmp_filename, real_filename):
+    def __init__(self, f, tmp_filename, real_filename, fsync=False):
         self._f = f
         self._tmp_filename = tmp_filename
         self._real_filename = real_filename
+        #: `False`, `True` to sync to disk on close or a batch object
+        #: with an ``add`` method that takes over syncing and renaming.
+        self._fsync = fsync
         self.closed = False
 
     @property
@@ -538,14 +816,25 @@ class _AtomicFile(object):
     def close(self, delete=False):
         if self.closed:
             return
+        if self._fsync is True:
+            self._f.flush()
+            os.fsync(self._f.fileno())
         self._f.close()
+        self.closed = True
+        if self._fsync not in (False, True):
+            self._fsync.add(self)
+            return
+        self._replace()
+        if self._fsync:
+            _fsync_dir(os.path.dirname(self._real_filename))
+
+    def _replace(self):
         if not _can_replace:
             try:
                 os.remove(self._real_filename)
             except OSError:
                 pass
         _replace(self._tmp_filename, self._real_filename)
-        self.closed = True
 
     def __getattr__(self, name):
         return getattr(self._f, name)
@@ -560,6 +849,78 @@ class _AtomicFile(object):
         return repr(self._f)
 
 
+class _FsyncBatch(object):
+    """Collects closed atomic files so that they are synced to disk and
+    moved into place together.  `schedule` is called with :meth:`commit`
+    when the first file of a new batch is added.
+    """
+
+    def __init__(self, schedule):
+        self._schedule = schedule
+        self._pending = []
+
+    def add(self, f):
+        if not self._pending:
+            self._schedule(self.commit)
+        self._pending.append(f)
+
+    def commit(self):
+        pending, self._pending = self._pending, []
+        # By now the kernel has usually written most of the data back on
+        # its own, which makes these syncs much cheaper than syncing each
+        # file right after writing it.
+        for f in pending:
+            fd = os.open(f._tmp_filename, os.O_RDWR)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        dirs = set()
+        for f in pending:
+            f._replace()
+            dirs.add(os.path.dirname(f._real_filename))
+        for path in dirs:
+            _fsync_dir(path)
+
+
+class _CompressedFile(object):
+    """Wraps a compressing or decompressing file object.  On close the
+    file object is closed first so that all data is flushed out, then the
+    underlying file (unless it is a standard stream).
+    """
+
+    def __init__(self, f, filename, fileobj=None):
+        self._f = f
+        self._filename = filename
+        self._fileobj = fileobj
+
+    @property
+    def name(self):
+        return self._filename
+
+    def close(self):
+        try:
+            self._f.close()
+        finally:
+            if self._fileobj is not None:
+                self._fileobj.close()
+
+    def __getattr__(self, name):
+        return getattr(self._f, name)
+
+    def __iter__(self):
+        return iter(self._f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def __repr__(self):
+        return repr(self._f)
+
+
 auto_wrap_for_ansi = None
 colorama = None
 get_winterm_size = None
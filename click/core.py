@@ -1,7 +1,8 @@
 import errno
-import inspect
 import os
 import sys
+import threading
+from collections import deque
 from contextlib import contextmanager
 from itertools import repeat
 from functools import update_wrapper
@@ -13,10 +14,12 @@ from .exceptions import ClickException, UsageError, BadParameter, Abort, \
      MissingParameter, Exit
 from .termui import prompt, confirm, style
 from .formatting import HelpFormatter, join_options
-from .parser import OptionParser, split_opt
+from .parser import OptionParser, split_opt, expand_response_files, \
+     _PrefixTrie, _normalize_token
 from .globals import push_context, pop_context
 
-from ._compat import PY2, isidentifier, iteritems, string_types
+from ._compat import PY2, isidentifier, iteritems, string_types, \
+     isawaitable, get_unbound_function
 from ._unicodefun import _check_for_unicode_literals, _verify_python3_env
 
 
@@ -133,17 +136,23 @@ class ParameterSource(object):
     """This is an enum that indicates the source of a command line parameter.
 
     The enum has one of the following values: COMMANDLINE,
-    ENVIRONMENT, DEFAULT, DEFAULT_MAP.  The DEFAULT indicates that the
-    default value in the decorator was used.  This class should be
-    converted to an enum when Python 2 support is dropped.
+    ENVIRONMENT, DEFAULT, DEFAULT_MAP, CONFIG.  The DEFAULT indicates that
+    the default value in the decorator was used.  CONFIG indicates that the
+    value was read from a configuration file by a
+    :class:`~click.ConfigDefaultMap`.  This class should be converted to
+    an enum when Python 2 support is dropped.
+
+    .. versionchanged:: 8.0
+       Added CONFIG.
     """
 
     COMMANDLINE = "COMMANDLINE"
     ENVIRONMENT = "ENVIRONMENT"
     DEFAULT = "DEFAULT"
     DEFAULT_MAP = "DEFAULT_MAP"
+    CONFIG = "CONFIG"
     
-    VALUES = {COMMANDLINE, ENVIRONMENT, DEFAULT, DEFAULT_MAP}
+    VALUES = {COMMANDLINE, ENVIRONMENT, DEFAULT, DEFAULT_MAP, CONFIG}
     
     @classmethod
     def validate(cls, value):
@@ -182,6 +191,10 @@ class Context(object):
        其中增加了 `color` 、 `ignore_unknown_options` 和
        `max_content_width` 参数。
 
+    .. versionadded:: 8.0
+       其中增加了 `cache_conversions` 、 `response_files` 和
+       `allow_abbreviations` 参数。
+
     :param command: 使用语境的命令类。
     :param parent: 父语境。
     :param info_name: 语境内部的信息名。通用中，描述的名字常是脚本或命令。
@@ -217,15 +230,53 @@ class Context(object):
     :param show_default: 如果设置成 `True` 的话，对于所有可选项来说会显示默认值。
                     即使一个可选项稍后用 `show_default=False` 来建立的话，
                     这种命令层的设置会覆写可选项层的值。
+    :param cache_conversions: 如果设置成 `True` 的话，纯类型 (查看
+                              :attr:`ParamType.pure` 属性) 的转换结果
+                              会在这个语境里缓存起来，重复的值只转换
+                              一次。默认值继承自父语境。
+    :param response_files: 如果设置成 `True` 的话， ``@file`` 形式的参数
+                           会被替换成文件里的参数，每行一个参数。设置成
+                           ``'nul'`` 的话，文件里的参数是用 NUL 字符分隔
+                           的 (例如 ``find -print0`` 的输出) 。
+                           ``@-`` 从标准输入读取参数。这样传递给一个
+                           ``nargs=-1`` 参数的参数数量不受 ``ARG_MAX``
+                           的限制，但是展开后的所有参数都保存在内存里。
+                           默认值继承自父语境。
+    :param allow_abbreviations: 如果设置成 `True` 的话，长可选项和子命令
+                                可以缩写成任何唯一的前缀，例如
+                                ``--verb`` 匹配 ``--verbose`` ，
+                                ``st`` 匹配 ``status`` 。前缀不唯一时
+                                会报错并列出所有可能的匹配。
+                                默认值继承自父语境。
     """
 
+    # Large command trees create many contexts and parameters, so their
+    # attributes live in slots.  ``__dict__`` keeps assigning other
+    # attributes working, the dictionary is only created when that
+    # happens.  Subclasses can add their own ``__slots__``.
+    __slots__ = ('parent', 'command', 'info_name', 'params', 'args',
+                 'protected_args', 'obj', '_meta', 'default_map',
+                 'invoked_subcommand', 'terminal_width',
+                 'max_content_width', 'allow_extra_args',
+                 'allow_interspersed_args', 'ignore_unknown_options',
+                 'help_option_names', 'token_normalize_func',
+                 'resilient_parsing', 'auto_envvar_prefix', 'color',
+                 'show_default', 'cache_conversions', '_conversion_cache',
+                 'response_files', 'allow_abbreviations',
+                 '_default_cache', '_environ',
+                 '_envvar_indexes', '_async_runner', '_close_callbacks',
+                 '_depth',
+                 '_source_by_paramname', '__dict__', '__weakref__')
+
     def __init__(self, command, parent=None, info_name=None, obj=None,
                  auto_envvar_prefix=None, default_map=None,
                  terminal_width=None, max_content_width=None,
                  resilient_parsing=False, allow_extra_args=None,
                  allow_interspersed_args=None,
                  ignore_unknown_options=None, help_option_names=None,
-                 token_normalize_func=None, color=None, show_default=None):
+                 token_normalize_func=None, color=None, show_default=None,
+                 cache_conversions=None, response_files=None,
+                 allow_abbreviations=None):
         #: the parent context or `None` if none exists.
         self.parent = parent
         #: the :class:`Command` for this context.
@@ -348,6 +399,45 @@ class Context(object):
 
         self.show_default = show_default
 
+        if cache_conversions is None:
+            cache_conversions = parent is not None \
+                and parent.cache_conversions
+        #: Indicates if conversion results of pure parameter types are
+        #: cached for the lifetime of this context.
+        #:
+        #: .. versionadded:: 8.0
+        self.cache_conversions = cache_conversions
+        self._conversion_cache = None
+        #: results of callable defaults by parameter, each default is
+        #: only called once per context.
+        self._default_cache = {}
+        #: the snapshot of the environment taken by the root context and
+        #: the variables in it indexed by envvar prefix.
+        self._environ = None
+        self._envvar_indexes = None
+
+        if response_files is None:
+            response_files = parent is not None \
+                and parent.response_files
+        #: Indicates if ``@file`` arguments are replaced by the arguments
+        #: stored in the file.  Either `False`, `True` for one argument
+        #: per line or ``'nul'`` for NUL separated arguments.
+        #:
+        #: .. versionadded:: 8.0
+        self.response_files = response_files
+
+        if allow_abbreviations is None:
+            allow_abbreviations = parent is not None \
+                and parent.allow_abbreviations
+        #: Indicates if long options and subcommands can be abbreviated
+        #: to a unique prefix.
+        #:
+        #: .. versionadded:: 8.0
+        self.allow_abbreviations = allow_abbreviations
+
+        #: runs the awaitables returned by callbacks, only set on the
+        #: root context.
+        self._async_runner = None
         self._close_callbacks = []
         self._depth = 0
         self._source_by_paramname = {}
@@ -437,6 +527,9 @@ class Context(object):
         opened by the :class:`File` type will register their close callbacks
         here.
 
+        .. versionchanged:: 8.0
+           The callback can be a coroutine function.
+
         :param f: the function to execute on teardown.
         """
         self._close_callbacks.append(f)
@@ -445,8 +538,27 @@ class Context(object):
     def close(self):
         """Invokes all close callbacks."""
         for cb in self._close_callbacks:
-            cb()
+            rv = cb()
+            if isawaitable(rv):
+                self._get_async_runner().run_close_callback(self, rv)
         self._close_callbacks = []
+        if self._async_runner is not None:
+            self._async_runner.close()
+            self._async_runner = None
+
+    def _run_awaitable(self, awaitable):
+        """Runs an awaitable returned by a callback on the event loop of
+        the invocation and returns its result.  If this is called from a
+        coroutine running on that loop, an awaitable is returned instead.
+        """
+        return self._get_async_runner().run(self, awaitable)
+
+    def _get_async_runner(self):
+        root = self.find_root()
+        if root._async_runner is None:
+            from ._asyncsupport import get_runner
+            get_runner(root)
+        return root._async_runner
 
     @property
     def command_path(self):
@@ -468,6 +580,34 @@ class Context(object):
             node = node.parent
         return node
 
+    def get_auto_envvars(self):
+        """Returns the environment variables that start with the
+        :attr:`auto_envvar_prefix` of this context, as a dictionary from
+        the rest of their name (after the underscore) to their value.
+
+        The environment is copied once per invocation, when the first
+        context looks up an automatic environment variable, and the
+        variables are indexed once per prefix.  Changes to
+        :data:`os.environ` after that are not seen by automatic
+        environment variables.
+
+        .. versionadded:: 8.0
+        """
+        if self.auto_envvar_prefix is None:
+            return {}
+        root = self.find_root()
+        if root._environ is None:
+            root._environ = dict(os.environ)
+            root._envvar_indexes = {}
+        prefix = self.auto_envvar_prefix + '_'
+        rv = root._envvar_indexes.get(prefix)
+        if rv is None:
+            n = len(prefix)
+            rv = root._envvar_indexes[prefix] = dict(
+                (key[n:], value) for key, value in iteritems(root._environ)
+                if key.startswith(prefix))
+        return rv
+
     def find_object(self, object_type):
         """Finds the closest object of a given type."""
         node = self
@@ -538,6 +678,12 @@ class Context(object):
         in against the intention of this code and no context was created.  For
         more information about this change and why it was done in a bugfix
         release see :ref:`upgrade-to-3.2`.
+
+        .. versionchanged:: 8.0
+           If the callback returns an awaitable (for instance because it is
+           a coroutine function), it is run on the event loop of the
+           invocation and its result is returned.  Called from a coroutine,
+           the awaitable is returned and has to be awaited.
         """
         self, callback = args[:2]
         ctx = self
@@ -560,7 +706,10 @@ class Context(object):
         args = args[2:]
         with augment_usage_errors(self):
             with ctx:
-                return callback(*args, **kwargs)
+                rv = callback(*args, **kwargs)
+                if isawaitable(rv):
+                    rv = ctx._run_awaitable(rv)
+                return rv
 
     def forward(*args, **kwargs):
         """Similar to :meth:`invoke` but fills in default keyword
@@ -673,6 +822,11 @@ class BaseCommand(object):
                 extra[key] = value
         ctx = Context(self, info_name=info_name, parent=parent, **extra)
         with ctx.scope(cleanup=False):
+            # Response files are only expanded once, by the outermost
+            # context that enables them.
+            if ctx.response_files and (
+                    parent is None or not parent.response_files):
+                args = expand_response_files(args, ctx.response_files)
             self.parse_args(ctx, args)
         return ctx
 
@@ -684,6 +838,18 @@ class BaseCommand(object):
         raise NotImplementedError('Base commands do not know how to parse '
                                   'arguments.')
 
+    def collect_envvars(self, ctx):
+        """Returns the environment variables this command and its
+        subcommands read, including automatic ones, as a list of
+        ``(envvar, ctx, param)`` tuples.  `ctx` is the context of the
+        command the parameter belongs to, nothing is parsed or invoked.
+        Hidden commands and parameters are included.  The contexts of
+        subcommands are closed before this returns.
+
+        .. versionadded:: 8.0
+        """
+        return []
+
     def invoke(self, ctx):
         """Given a context, this invokes the command.  The default
         implementation is raising a not implemented error.
@@ -794,6 +960,24 @@ class BaseCommand(object):
             echo('Aborted!', file=sys.stderr)
             sys.exit(1)
 
+    def main_async(self, args=None, prog_name=None, complete_var=None,
+                   standalone_mode=True, **extra):
+        """Like :meth:`main` but returns a coroutine that has to be awaited
+        in a running event loop.  The command is run in a worker thread of
+        the loop's default executor and the awaitables returned by
+        callbacks, result callbacks and close callbacks are run on the
+        calling loop, so they can share connections with the rest of an
+        asyncio application.  In standalone mode awaiting it raises
+        ``SystemExit`` just like :meth:`main` exits.
+
+        This requires Python 3.5 or later.
+
+        .. versionadded:: 8.0
+        """
+        from ._asyncsupport import main_async
+        return main_async(self, (args, prog_name, complete_var,
+                                 standalone_mode), extra)
+
     def __call__(self, *args, **kwargs):
         """Alias for :meth:`main`."""
         return self.main(*args, **kwargs)
@@ -875,6 +1059,10 @@ class Command(BaseCommand):
             rv = rv + [help_option]
         return rv
 
+    def collect_envvars(self, ctx):
+        return [(envvar, ctx, param) for param in self.get_params(ctx)
+                for envvar in param.get_envvars(ctx)]
+
     def format_usage(self, ctx, formatter):
         """Writes the usage line into the formatter.
 
@@ -1030,14 +1218,29 @@ class MultiCommand(Command):
                   这会限制命令的形式，命令不能有可选项参数，但允许有
                   多命令串联在一起。
     :param result_callback: 提供给这个多命令的回调结果。
+    :param concurrency: 在锁链模式中，同时运行的子命令最大数量。
+                        如果大于 ``1`` 的话，锁链中的子命令会在线程里
+                        并发运行。子命令的语法分析依然是按顺序进行的，
+                        结果回调得到的结果列表也保持命令行中的顺序。
+                        如果一个子命令失败的话，不会再启动后续的子命令，
+                        所有子语境都会被关闭，然后抛出第一个失败子命令
+                        的例外。
+
+    .. versionadded:: 8.0
+       其中增加了 `concurrency` 参数。
     """
     allow_extra_args = True
     allow_interspersed_args = False
 
     def __init__(self, name=None, invoke_without_command=False,
                  no_args_is_help=None, subcommand_metavar=None,
-                 chain=False, result_callback=None, **attrs):
+                 chain=False, result_callback=None, concurrency=None,
+                 **attrs):
         Command.__init__(self, name, **attrs)
+        if concurrency is not None and not chain:
+            raise TypeError('concurrency is only supported in chain mode.')
+        if concurrency is not None and concurrency < 1:
+            raise ValueError('concurrency must be at least 1.')
         if no_args_is_help is None:
             no_args_is_help = not invoke_without_command
         self.no_args_is_help = no_args_is_help
@@ -1049,6 +1252,11 @@ class MultiCommand(Command):
                 subcommand_metavar = SUBCOMMAND_METAVAR
         self.subcommand_metavar = subcommand_metavar
         self.chain = chain
+        #: The number of chained subcommands that are run at the same
+        #: time, `None` runs them one after another.
+        #:
+        #: .. versionadded:: 8.0
+        self.concurrency = concurrency
         #: The result callback that is stored.  This can be set or
         #: overridden with the :func:`resultcallback` decorator.
         self.result_callback = result_callback
@@ -1209,12 +1417,61 @@ class MultiCommand(Command):
                 contexts.append(sub_ctx)
                 args, sub_ctx.args = sub_ctx.args, []
 
-            rv = []
-            for sub_ctx in contexts:
-                with sub_ctx:
-                    rv.append(sub_ctx.command.invoke(sub_ctx))
+            if self.concurrency is not None and self.concurrency > 1 \
+               and len(contexts) > 1:
+                rv = self._invoke_concurrently(ctx, contexts)
+            else:
+                rv = []
+                for sub_ctx in contexts:
+                    with sub_ctx:
+                        rv.append(sub_ctx.command.invoke(sub_ctx))
             return _process_result(rv)
 
+    def _invoke_concurrently(self, ctx, contexts):
+        """Invokes the chained contexts in up to :attr:`concurrency`
+        threads and returns their results in order.  After a failure no
+        more subcommands are started, the contexts that did not run are
+        closed and the first exception in chain order is raised.
+        """
+        # Awaitables of the workers must run on the event loop of the
+        # invocation, so the root gets its runner before they start.
+        if sys.version_info >= (3, 5):
+            ctx._get_async_runner()
+
+        results = [None] * len(contexts)
+        errors = []
+        slots = threading.BoundedSemaphore(self.concurrency)
+
+        def run(idx, sub_ctx):
+            try:
+                with sub_ctx:
+                    results[idx] = sub_ctx.command.invoke(sub_ctx)
+            except BaseException as e:
+                errors.append((idx, e))
+            finally:
+                slots.release()
+
+        threads = []
+        try:
+            for idx, sub_ctx in enumerate(contexts):
+                slots.acquire()
+                if errors:
+                    slots.release()
+                    break
+                thread = threading.Thread(target=run, args=(idx, sub_ctx))
+                thread.daemon = True
+                thread.start()
+                threads.append(thread)
+        finally:
+            for thread in threads:
+                thread.join()
+            for sub_ctx in contexts[len(threads):]:
+                sub_ctx.close()
+
+        if errors:
+            raise min(errors, key=lambda x: x[0])[1]
+        return results
+
     def resolve_command(self, ctx, args):
         cmd_name = make_str(args[0])
         original_cmd_name = cmd_name
@@ -1225,9 +1482,20 @@ class MultiCommand(Command):
         # If we can't find the command but there is a normalization
         # function available, we try with that one.
         if cmd is None and ctx.token_normalize_func is not None:
-            cmd_name = ctx.token_normalize_func(cmd_name)
+            cmd_name = _normalize_token(cmd_name, ctx.token_normalize_func)
             cmd = self.get_command(ctx, cmd_name)
 
+        # Abbreviations are only tried after the full name, a command
+        # that is a prefix of another command is still found.
+        if cmd is None and ctx.allow_abbreviations and cmd_name:
+            matches = self._get_command_trie(ctx).words(cmd_name)
+            if len(matches) == 1:
+                cmd_name = matches[0]
+                cmd = self.get_command(ctx, cmd_name)
+            elif matches and not ctx.resilient_parsing:
+                ctx.fail('Ambiguous command "%s", could be: %s.' % (
+                    original_cmd_name, ', '.join(sorted(matches))))
+
         # If we don't find the command we want to show an error message
         # to the user that it was not provided.  However, there is
         # something else we should do: if the first argument looks like
@@ -1247,6 +1515,23 @@ class MultiCommand(Command):
         """
         raise NotImplementedError()
 
+    def _get_command_trie(self, ctx):
+        """Returns a :class:`~click.parser._PrefixTrie` of the command
+        names used to resolve abbreviations.
+        """
+        return _PrefixTrie((name, name) for name in self.list_commands(ctx))
+
+    def collect_envvars(self, ctx):
+        rv = Command.collect_envvars(self, ctx)
+        # Hidden commands are included, they still read the environment.
+        for cmd_name in self.list_commands(ctx):
+            cmd = self.get_command(ctx, cmd_name)
+            if cmd is None:
+                continue
+            with Context(cmd, parent=ctx, info_name=cmd_name) as sub_ctx:
+                rv.extend(cmd.collect_envvars(sub_ctx))
+        return rv
+
     def list_commands(self, ctx):
         """Returns a list of subcommand names in the order they should
         appear.
@@ -1254,6 +1539,82 @@ class MultiCommand(Command):
         return []
 
 
+class _CommandDict(dict):
+    """The dictionary of a group's commands.  It counts modifications so
+    that the sorted names and the indexes of command collections can be
+    cached until the commands change.
+    """
+
+    __slots__ = ('version', '_sorted_names', '_prefix_trie')
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self.version = 0
+        self._sorted_names = None
+        self._prefix_trie = None
+
+    def _changed(self):
+        self.version += 1
+        self._sorted_names = None
+        self._prefix_trie = None
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._changed()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        dict.clear(self)
+        self._changed()
+
+    def pop(self, *args):
+        rv = dict.pop(self, *args)
+        self._changed()
+        return rv
+
+    def popitem(self):
+        rv = dict.popitem(self)
+        self._changed()
+        return rv
+
+    def setdefault(self, key, default=None):
+        rv = dict.setdefault(self, key, default)
+        self._changed()
+        return rv
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        self._changed()
+
+    def sorted_names(self):
+        if self._sorted_names is None:
+            self._sorted_names = sorted(self)
+        return self._sorted_names
+
+    def prefix_trie(self):
+        if self._prefix_trie is None:
+            self._prefix_trie = _PrefixTrie(
+                (name, name) for name in self.sorted_names())
+        return self._prefix_trie
+
+
+def _has_plain_commands(multi_cmd):
+    # Groups that only know the commands in their dictionary, these can
+    # be indexed by command collections.
+    cls, f = type(multi_cmd), get_unbound_function
+    return isinstance(multi_cmd, Group) \
+        and isinstance(multi_cmd.commands, _CommandDict) \
+        and f(cls.get_command) is f(Group.get_command) \
+        and f(cls.list_commands) is f(Group.list_commands)
+
+
 class Group(MultiCommand):
     """一个群组命令类，允许一个主命令有许多子命令在其后。
     最共性的方法就是在 Click 中部署嵌入式命令。
@@ -1263,8 +1624,12 @@ class Group(MultiCommand):
 
     def __init__(self, name=None, commands=None, **attrs):
         MultiCommand.__init__(self, name, **attrs)
-        #: the registered subcommands by their exported names.
-        self.commands = commands or {}
+        #: the registered subcommands by their exported names.  A
+        #: dictionary that is passed in is used as is, the cached command
+        #: names and indexes are only available for the default one.
+        if commands is None:
+            commands = _CommandDict()
+        self.commands = commands
 
     def add_command(self, cmd, name=None):
         """Registers another :class:`Command` with this group.  If the name
@@ -1304,8 +1669,15 @@ class Group(MultiCommand):
         return self.commands.get(cmd_name)
 
     def list_commands(self, ctx):
+        if isinstance(self.commands, _CommandDict):
+            return list(self.commands.sorted_names())
         return sorted(self.commands)
 
+    def _get_command_trie(self, ctx):
+        if _has_plain_commands(self):
+            return self.commands.prefix_trie()
+        return MultiCommand._get_command_trie(self, ctx)
+
 
 class CommandCollection(MultiCommand):
     """一个命令收集类是把多个多命令合并成一个多命令的类。
@@ -1317,25 +1689,69 @@ class CommandCollection(MultiCommand):
         MultiCommand.__init__(self, name, **attrs)
         #: The list of registered multi commands.
         self.sources = sources or []
+        self._index = None
+        self._index_key = None
+        self._trie = None
+        self._trie_index = None
 
     def add_source(self, multi_cmd):
         """Adds a new multi command to the chain dispatcher."""
         self.sources.append(multi_cmd)
 
-    def get_command(self, ctx, cmd_name):
+    def _get_index(self):
+        """Returns the merged commands of all sources by name and their
+        sorted names, or `None` if a source can resolve commands that it
+        does not list.  The index is rebuilt when the sources or their
+        commands change.
+        """
+        key = []
         for source in self.sources:
-            rv = source.get_command(ctx, cmd_name)
-            if rv is not None:
-                if self.chain:
-                    _check_multicommand(self, cmd_name, rv)
-                return rv
+            if not _has_plain_commands(source):
+                return None
+            key.append((source, source.commands.version))
+        key = tuple(key)
+        if self._index_key != key:
+            commands = {}
+            # The first source with a command wins.
+            for source in reversed(self.sources):
+                commands.update(source.commands)
+            self._index = commands, sorted(commands)
+            self._index_key = key
+        return self._index
+
+    def get_command(self, ctx, cmd_name):
+        index = self._get_index()
+        if index is not None:
+            rv = index[0].get(cmd_name)
+        else:
+            rv = None
+            for source in self.sources:
+                rv = source.get_command(ctx, cmd_name)
+                if rv is not None:
+                    break
+        if rv is not None:
+            if self.chain:
+                _check_multicommand(self, cmd_name, rv)
+            return rv
 
     def list_commands(self, ctx):
+        index = self._get_index()
+        if index is not None:
+            return list(index[1])
         rv = set()
         for source in self.sources:
             rv.update(source.list_commands(ctx))
         return sorted(rv)
 
+    def _get_command_trie(self, ctx):
+        index = self._get_index()
+        if index is None:
+            return MultiCommand._get_command_trie(self, ctx)
+        if self._trie_index is not index:
+            self._trie = _PrefixTrie((name, name) for name in index[1])
+            self._trie_index = index
+        return self._trie
+
 
 class Parameter(object):
     r"""提供给命令的一种参数形式，有 2 个版本。
@@ -1349,6 +1765,9 @@ class Parameter(object):
        在 Click 2.0 版本中，老旧的回调格式依然有效，但
        会抛出一个警告，可以变成更容易的代码格式。
 
+    .. versionadded:: 8.0
+       其中增加了 `as_array` 和 `deferred` 参数。
+
     :param param_decls: 针对可选项或参数的参数形式声明。
                         这是一个旗语组成的列表，或参数名组成的列表。
     :param type: 你应该使用的类型。既可以是一个 :class:`ParamType`
@@ -1373,13 +1792,31 @@ class Parameter(object):
                      把处理顺序变成逆序。
     :param envvar: 一个字符串或字符串组成的一个列表。
                    内容都是应该被检查的环境变量名。
+    :param as_array: 如果设置成 `True` 的话，接收多个值的参数形式
+                     (``nargs`` 不是 ``1`` 或 ``multiple=True``) 会
+                     通过 :meth:`ParamType.convert_many` 方法返回一个
+                     NumPy 数组，而不再是元组了。需要安装 NumPy 库。
+    :param deferred: 如果设置成 `True` 的话，语法分析时不再转换值，也
+                     不再计算默认值。 ``ctx.params`` 里和命令回调函数
+                     得到的是一个 :class:`DeferredValue` 对象，第一次
+                     调用它的 :meth:`~DeferredValue.get` 方法时才进行
+                     转换。对于期望的、必需的、有回调函数的参数形式，
+                     以及需要提示输入的可选项来说，这个参数会被忽略，
+                     依然立即处理它们的值。
     """
     param_type_name = 'parameter'
 
+    # See Context for why slots are used.
+    __slots__ = ('name', 'opts', 'secondary_opts', 'type', 'required',
+                 'callback', 'nargs', 'multiple', 'expose_value',
+                 'default', 'is_eager', 'metavar', 'envvar',
+                 'autocompletion', 'as_array', 'deferred', '__dict__',
+                 '__weakref__')
+
     def __init__(self, param_decls=None, type=None, required=False,
                  default=None, callback=None, nargs=None, metavar=None,
                  expose_value=True, is_eager=False, envvar=None,
-                 autocompletion=None):
+                 autocompletion=None, as_array=False, deferred=False):
         self.name, self.opts, self.secondary_opts = \
             self._parse_decls(param_decls or (), expose_value)
 
@@ -1403,6 +1840,8 @@ class Parameter(object):
         self.metavar = metavar
         self.envvar = envvar
         self.autocompletion = autocompletion
+        self.as_array = as_array
+        self.deferred = deferred
 
     @property
     def human_readable_name(self):
@@ -1411,6 +1850,14 @@ class Parameter(object):
         """
         return self.name
 
+    @property
+    def is_deferred(self):
+        """Indicates if the value is processed on first access instead of
+        while parsing.
+        """
+        return self.deferred and not (self.is_eager or self.required or
+                                      self.callback is not None)
+
     def make_metavar(self):
         if self.metavar is not None:
             return self.metavar
@@ -1425,7 +1872,9 @@ class Parameter(object):
         """Given a context variable this calculates the default value."""
         # Otherwise go with the regular default.
         if callable(self.default):
-            rv = self.default()
+            rv = ctx._default_cache.get(self, _missing)
+            if rv is _missing:
+                rv = ctx._default_cache[self] = self.default()
         else:
             rv = self.default
         return self.type_cast_value(ctx, rv)
@@ -1441,7 +1890,9 @@ class Parameter(object):
             source = ParameterSource.ENVIRONMENT
         if value is None:
             value = ctx.lookup_default(self.name)
-            source = ParameterSource.DEFAULT_MAP
+            # Default maps can report a more specific source.
+            source = getattr(ctx.default_map, 'parameter_source',
+                             ParameterSource.DEFAULT_MAP)
         if value is not None:
             ctx.set_parameter_source(self.name, source)
         return value
@@ -1464,8 +1915,19 @@ class Parameter(object):
         def _convert(value, level):
             if level == 0:
                 return self.type(value, self, ctx)
+            if level == 1:
+                return self.type.convert_many(value or (), self, ctx,
+                                              as_array=self.as_array)
             return tuple(_convert(x, level - 1) for x in value or ())
-        return _convert(value, (self.nargs != 1) + bool(self.multiple))
+
+        level = (self.nargs != 1) + bool(self.multiple)
+        if level == 2 and self.as_array:
+            # Multiple values with a fixed nargs turn into a single
+            # two-dimensional array with one row per occurrence.
+            flat = [x for row in value or () for x in row]
+            rv = self.type.convert_many(flat, self, ctx, as_array=True)
+            return rv.reshape(-1, self.nargs)
+        return _convert(value, level)
 
     def process_value(self, ctx, value):
         """Given a value and context this runs the logic to convert the
@@ -1481,8 +1943,11 @@ class Parameter(object):
     def value_is_missing(self, value):
         if value is None:
             return True
-        if (self.nargs != 1 or self.multiple) and value == ():
-            return True
+        if self.nargs != 1 or self.multiple:
+            if self.as_array:
+                return len(value) == 0
+            if value == ():
+                return True
         return False
 
     def full_process_value(self, ctx, value):
@@ -1498,6 +1963,18 @@ class Parameter(object):
 
         return value
 
+    def get_envvars(self, ctx):
+        """Returns the names of the environment variables this parameter
+        reads in the order they are checked.
+
+        .. versionadded:: 8.0
+        """
+        if self.envvar is None:
+            return []
+        if isinstance(self.envvar, (tuple, list)):
+            return list(self.envvar)
+        return [self.envvar]
+
     def resolve_envvar_value(self, ctx):
         if self.envvar is None:
             return
@@ -1518,12 +1995,15 @@ class Parameter(object):
     def handle_parse_result(self, ctx, opts, args):
         with augment_usage_errors(ctx, param=self):
             value = self.consume_value(ctx, opts)
-            try:
-                value = self.full_process_value(ctx, value)
-            except Exception:
-                if not ctx.resilient_parsing:
-                    raise
-                value = None
+            if self.is_deferred:
+                value = DeferredValue(self, ctx, value)
+            else:
+                try:
+                    value = self.full_process_value(ctx, value)
+                except Exception:
+                    if not ctx.resilient_parsing:
+                        raise
+                    value = None
             if self.callback is not None:
                 try:
                     value = invoke_param_callback(
@@ -1583,6 +2063,11 @@ class Option(Parameter):
     """
     param_type_name = 'option'
 
+    __slots__ = ('prompt', 'confirmation_prompt', 'hide_input', 'hidden',
+                 'is_flag', 'flag_value', 'is_bool_flag', 'count',
+                 'allow_from_autoenv', 'help', 'show_default',
+                 'show_choices', 'show_envvar')
+
     def __init__(self, param_decls=None, show_default=False,
                  prompt=False, confirmation_prompt=False,
                  hide_input=False, is_flag=None, flag_value=None,
@@ -1766,8 +2251,10 @@ class Option(Parameter):
                 default_string = '({})'.format(self.show_default)
             elif isinstance(self.default, (list, tuple)):
                 default_string = ', '.join('%s' % d for d in self.default)
-            elif inspect.isfunction(self.default):
-                default_string = "(dynamic)"
+            elif callable(self.default):
+                # Callable defaults are never called to render the help.
+                label = getattr(self.default, 'label', None)
+                default_string = '({})'.format(label or 'dynamic')
             else:
                 default_string = self.default
             extra.append('default: {}'.format(default_string))
@@ -1810,14 +2297,20 @@ class Option(Parameter):
                       confirmation_prompt=self.confirmation_prompt,
                       value_proc=lambda x: self.process_value(ctx, x))
 
+    def get_envvars(self, ctx):
+        rv = Parameter.get_envvars(self, ctx)
+        if self.allow_from_autoenv and \
+           ctx.auto_envvar_prefix is not None:
+            rv.append('%s_%s' % (ctx.auto_envvar_prefix, self.name.upper()))
+        return rv
+
     def resolve_envvar_value(self, ctx):
         rv = Parameter.resolve_envvar_value(self, ctx)
         if rv is not None:
             return rv
         if self.allow_from_autoenv and \
            ctx.auto_envvar_prefix is not None:
-            envvar = '%s_%s' % (ctx.auto_envvar_prefix, self.name.upper())
-            return os.environ.get(envvar)
+            return ctx.get_auto_envvars().get(self.name.upper())
 
     def value_from_envvar(self, ctx):
         rv = self.resolve_envvar_value(ctx)
@@ -1830,6 +2323,10 @@ class Option(Parameter):
                 rv = batch(rv, self.nargs)
         return rv
 
+    @property
+    def is_deferred(self):
+        return Parameter.is_deferred.fget(self) and self.prompt is None
+
     def full_process_value(self, ctx, value):
         if value is None and self.prompt is not None \
            and not ctx.resilient_parsing:
@@ -1843,10 +2340,21 @@ class Argument(Parameter):
     不会抛出例外错误，而且默认都会使用。
 
     所有参数都代入到参数形式构造器中。
+
+    .. versionadded:: 8.0
+       其中增加了 `lazy` 参数。
+
+    :param lazy: 如果设置成 `True` 的话， ``nargs=-1`` 参数的值是一个
+                 只能迭代一次的懒蛋迭代器，而不是一个元组。每个值在
+                 迭代到的时候才进行转换，转换过的值不会保存起来，这样
+                 处理大量值的命令可以立即开始工作，内存使用也保持不变。
+                 转换错误依然会作为 :exc:`BadParameter` 报告出来。
     """
     param_type_name = 'argument'
 
-    def __init__(self, param_decls, required=None, **attrs):
+    __slots__ = ('lazy',)
+
+    def __init__(self, param_decls, required=None, lazy=False, **attrs):
         if required is None:
             if attrs.get('default') is not None:
                 required = False
@@ -1856,6 +2364,10 @@ class Argument(Parameter):
         if self.default is not None and self.nargs < 0:
             raise TypeError('nargs=-1 in combination with a default value '
                             'is not supported.')
+        if lazy and (self.nargs != -1 or self.as_array):
+            raise TypeError('Only nargs=-1 arguments without as_array can '
+                            'be lazy.')
+        self.lazy = lazy
 
     @property
     def human_readable_name(self):
@@ -1894,10 +2406,87 @@ class Argument(Parameter):
     def get_error_hint(self, ctx):
         return '"%s"' % self.make_metavar()
 
+    def type_cast_value(self, ctx, value):
+        if self.lazy:
+            return _LazyValues(self, ctx, value)
+        return Parameter.type_cast_value(self, ctx, value)
+
+    def value_is_missing(self, value):
+        if self.lazy and value is not None:
+            return len(value) == 0
+        return Parameter.value_is_missing(self, value)
+
     def add_to_parser(self, parser, ctx):
         parser.add_argument(dest=self.name, nargs=self.nargs,
                             obj=self)
 
 
+class DeferredValue(object):
+    """一个延迟处理的参数形式值 (查看 :class:`Parameter` 类的 `deferred`
+    参数) 。语法分析时只记录下原始值，第一次调用 :meth:`get` 方法时才
+    进行转换或计算默认值，结果会保存起来。转换错误会在调用 :meth:`get`
+    方法时作为 :exc:`BadParameter` 报告出来。
+
+    .. versionadded:: 8.0
+    """
+
+    def __init__(self, param, ctx, value):
+        #: 值所属的参数形式。
+        self.param = param
+        #: 值所属的语境。
+        self.ctx = ctx
+        self._raw = value
+        self._value = _missing
+
+    @property
+    def is_resolved(self):
+        """值是否已经处理过了。"""
+        return self._value is not _missing
+
+    def get(self):
+        """返回处理后的值，第一次调用时进行处理。"""
+        if self._value is _missing:
+            with augment_usage_errors(self.ctx, param=self.param):
+                self._value = self.param.full_process_value(self.ctx,
+                                                            self._raw)
+            self._raw = None
+        return self._value
+
+    def __repr__(self):
+        if self.is_resolved:
+            return '<DeferredValue %s=%r>' % (self.param.name, self._value)
+        return '<DeferredValue %s (unresolved)>' % self.param.name
+
+
+class _LazyValues(object):
+    """The value of a lazy argument.  Values are converted as they are
+    iterated over and dropped from the remaining values right away.
+    """
+
+    def __init__(self, param, ctx, values):
+        self._param = param
+        self._ctx = ctx
+        self._values = deque(values)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._values:
+            raise StopIteration()
+        value = self._values.popleft()
+        with augment_usage_errors(self._ctx, param=self._param):
+            return self._param.type(value, self._param, self._ctx)
+
+    next = __next__
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return '<lazy values of %s, %d remaining>' % (
+            self._param.name, len(self._values))
+
+
 # Circular dependency between decorators and core
 from .decorators import command, group
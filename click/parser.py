@@ -25,6 +25,12 @@ import re
 from collections import deque
 from .exceptions import UsageError, NoSuchOption, BadOptionUsage, \
      BadArgumentUsage
+from .utils import _LRUCache
+
+
+# The results of token normalization functions by function.
+_normalize_caches = {}
+_normalize_cache_size = 4096
 
 
 def _unpack_args(args, nargs_spec):
@@ -93,11 +99,90 @@ def split_opt(opt):
     return first, opt[1:]
 
 
+def _normalize_token(token, func):
+    """Returns ``func(token)``.  Normalization functions are expected to
+    be pure, so the same tokens (option names are normalized for every
+    parser that is created) are only normalized once.
+    """
+    cache = _normalize_caches.get(func)
+    if cache is None:
+        # Normalization functions are usually module level functions but
+        # they might also be created per context.
+        if len(_normalize_caches) >= 8:
+            _normalize_caches.clear()
+        cache = _normalize_caches[func] = _LRUCache(_normalize_cache_size)
+    rv = cache.get(token)
+    if rv is None:
+        rv = cache[token] = func(token)
+    return rv
+
+
 def normalize_opt(opt, ctx):
     if ctx is None or ctx.token_normalize_func is None:
         return opt
     prefix, opt = split_opt(opt)
-    return prefix + ctx.token_normalize_func(opt)
+    return prefix + _normalize_token(opt, ctx.token_normalize_func)
+
+
+class _PrefixTrie(object):
+    """Maps words to values and finds them by prefix.  Every node knows
+    the words below it and the value they share, so looking up a prefix
+    only walks the characters of the prefix.
+    """
+
+    __slots__ = ('_root',)
+
+    def __init__(self, items=()):
+        # A node is ``[children, words, value]``, `value` is `_ambiguous`
+        # if the words below the node have different values.
+        self._root = [{}, [], None]
+        for word, value in items:
+            self.add(word, value)
+
+    def add(self, word, value):
+        node = self._root
+        self._add_to_node(node, word, value)
+        for char in word:
+            child = node[0].get(char)
+            if child is None:
+                child = node[0][char] = [{}, [], None]
+            node = child
+            self._add_to_node(node, word, value)
+
+    @staticmethod
+    def _add_to_node(node, word, value):
+        if not node[1]:
+            node[2] = value
+        elif node[2] is not value:
+            node[2] = _ambiguous
+        node[1].append(word)
+
+    def _find(self, prefix):
+        node = self._root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def words(self, prefix):
+        """Returns the words that start with `prefix`."""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return list(node[1])
+
+    def unique(self, prefix):
+        """Returns the value of the words that start with `prefix` or
+        `None` if there are none or they have different values.
+        """
+        node = self._find(prefix)
+        if node is None or node[2] is _ambiguous:
+            return None
+        return node[2]
+
+
+_ambiguous = object()
 
 
 def split_arg_string(string):
@@ -118,7 +203,50 @@ def split_arg_string(string):
     return rv
 
 
+def expand_response_files(args, mode=True):
+    """Given a list of arguments this replaces every ``@file`` argument
+    with the arguments stored in that file and returns a new list.  The
+    arguments are stored one per line, or separated by NUL characters if
+    `mode` is ``'nul'`` (as written by ``find -print0``).  ``@-`` reads
+    the arguments from stdin.  The files are read and split in chunks so
+    that the file contents never have to be held in memory as one
+    string, but the returned list holds all expanded arguments, because
+    the parser and ``nargs=-1`` parameters need all of them anyway.
+    Arguments read from files are not expanded again.
+    """
+    from ._compat import PY2, get_filesystem_encoding, get_streerror
+    from .exceptions import FileError
+    from .utils import open_file, _iter_split_chunks
+
+    nul = mode == 'nul'
+    # Decode like the interpreter decodes sys.argv.
+    encoding = None if PY2 else get_filesystem_encoding()
+    errors = 'strict' if PY2 else 'surrogateescape'
+    rv = []
+    for arg in args:
+        if arg[:1] != '@' or len(arg) == 1:
+            rv.append(arg)
+            continue
+        filename = arg[1:]
+        try:
+            f = open_file(filename, 'rb')
+        except (IOError, OSError) as e:
+            raise FileError(filename, hint=get_streerror(e))
+        with f:
+            for chunk in _iter_split_chunks(f, nul and '\0' or '\n',
+                                            encoding=encoding,
+                                            errors=errors):
+                if not nul:
+                    chunk = [x[:-1] if x[-1:] == '\r' else x for x in chunk]
+                rv.extend(chunk)
+    return rv
+
+
 class Option(object):
+    # Parsers are set up for every invocation of every command, so these
+    # objects are kept small.  Subclasses without slots get a __dict__.
+    __slots__ = ('_short_opts', '_long_opts', 'prefixes', 'dest', 'action',
+                 'nargs', 'const', 'obj')
 
     def __init__(self, opts, dest, action=None, nargs=1, const=None, obj=None):
         self._short_opts = []
@@ -167,6 +295,7 @@ class Option(object):
 
 
 class Argument(object):
+    __slots__ = ('dest', 'nargs', 'obj')
 
     def __init__(self, dest, nargs=1, obj=None):
         self.dest = dest
@@ -186,6 +315,7 @@ class Argument(object):
 
 
 class ParsingState(object):
+    __slots__ = ('opts', 'largs', 'rargs', 'order')
 
     def __init__(self, rargs):
         self.opts = {}
@@ -219,11 +349,19 @@ class OptionParser(object):
         #: second mode where it will ignore it and continue processing
         #: after shifting all the unknown options into the resulting args.
         self.ignore_unknown_options = False
+        #: If this is set to `True` long options can be abbreviated to
+        #: any unique prefix, ``--verb`` matches ``--verbose`` if no
+        #: other long option starts with it.
+        #:
+        #: .. versionadded:: 8.0
+        self.allow_abbreviations = False
         if ctx is not None:
             self.allow_interspersed_args = ctx.allow_interspersed_args
             self.ignore_unknown_options = ctx.ignore_unknown_options
+            self.allow_abbreviations = ctx.allow_abbreviations
         self._short_opt = {}
         self._long_opt = {}
+        self._long_opt_trie = None
         self._opt_prefixes = set(['-', '--'])
         self._args = []
 
@@ -247,6 +385,7 @@ class OptionParser(object):
             self._short_opt[opt] = option
         for opt in option._long_opts:
             self._long_opt[opt] = option
+        self._long_opt_trie = None
 
     def add_argument(self, dest, nargs=1, obj=None):
         """Adds a positional argument named `dest` to the parser.
@@ -320,13 +459,27 @@ class OptionParser(object):
         # *empty* -- still a subset of [arg0, ..., arg(i-1)], but
         # not a very interesting subset!
 
+    def _get_long_opt_trie(self):
+        # Only built when an option is not found, most command lines
+        # never need it.
+        if self._long_opt_trie is None:
+            self._long_opt_trie = _PrefixTrie(self._long_opt.items())
+        return self._long_opt_trie
+
     def _match_long_opt(self, opt, explicit_value, state):
-        if opt not in self._long_opt:
-            possibilities = [word for word in self._long_opt
-                             if word.startswith(opt)]
-            raise NoSuchOption(opt, possibilities=possibilities, ctx=self.ctx)
+        option = self._long_opt.get(opt)
+        if option is None:
+            trie = self._get_long_opt_trie()
+            prefix, name = split_opt(opt)
+            # "-v" is a short option, never an abbreviation of "-verbose".
+            if self.allow_abbreviations and name \
+               and opt not in self._short_opt \
+               and (len(prefix) > 1 or len(name) > 1):
+                option = trie.unique(opt)
+            if option is None:
+                raise NoSuchOption(opt, possibilities=trie.words(opt),
+                                   ctx=self.ctx)
 
-        option = self._long_opt[opt]
         if option.takes_value:
             # At this point it's safe to modify rargs by injecting the
             # explicit value, because no exception is raised in this
@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+click.pipeline
+~~~~~~~~~~~~~~
+
+Streaming pipelines built from chained subcommands.  Every subcommand
+returns a stage and the result callback runs the items through them.
+The items are passed between the stages in batches.
+"""
+import threading
+from functools import update_wrapper
+from itertools import chain, islice
+
+from .globals import get_current_context, push_context, pop_context
+
+
+def _iter_batches(items, batch_size):
+    it = iter(items)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_items(batches):
+    return chain.from_iterable(batches)
+
+
+class PipelineStage(object):
+    """一个管道阶段，是用 :func:`processor` 、 :func:`generator` 或
+    :func:`mapper` 装饰器装饰过的回调函数的返回值。子类可以覆写
+    :meth:`process` 方法来实现自定义的阶段。
+
+    .. versionadded:: 8.0
+
+    :param func: 阶段的函数。
+    :param args: 调用函数时额外的位置参数。
+    :param kwargs: 调用函数时额外的关键字参数，通常是命令的参数。
+    """
+
+    def __init__(self, func, args=(), kwargs=None):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs or {}
+
+    def process(self, batches, batch_size):
+        """Takes an iterator of batches (lists of items) and returns an
+        iterator of the batches this stage produces.
+        """
+        raise NotImplementedError()
+
+
+class _Processor(PipelineStage):
+
+    def __init__(self, func, args, kwargs, batched):
+        PipelineStage.__init__(self, func, args, kwargs)
+        self.batched = batched
+
+    def process(self, batches, batch_size):
+        if self.batched:
+            return self.func(batches, *self.args, **self.kwargs)
+        return _iter_batches(self.func(_iter_items(batches), *self.args,
+                                       **self.kwargs), batch_size)
+
+
+class _Generator(PipelineStage):
+
+    def process(self, batches, batch_size):
+        for batch in batches:
+            yield batch
+        for batch in _iter_batches(self.func(*self.args, **self.kwargs),
+                                   batch_size):
+            yield batch
+
+
+class _Mapper(PipelineStage):
+
+    def __init__(self, func, args, kwargs, workers, ordered, queue_size):
+        PipelineStage.__init__(self, func, args, kwargs)
+        self.workers = workers
+        self.ordered = ordered
+        self.queue_size = queue_size
+
+    def map_batch(self, batch):
+        func, args, kwargs = self.func, self.args, self.kwargs
+        return [func(item, *args, **kwargs) for item in batch]
+
+    def process(self, batches, batch_size):
+        if not self.workers or self.workers < 2:
+            return (self.map_batch(batch) for batch in batches)
+        return self._process_parallel(batches)
+
+    def _process_parallel(self, batches):
+        try:
+            import queue
+        except ImportError:
+            import Queue as queue
+
+        # Batches that were handed out and not yielded yet.  Reading
+        # the input stops at this limit, that is the backpressure.
+        limit = self.queue_size or 2 * self.workers
+        tasks = queue.Queue()
+        results = queue.Queue()
+        stopped = threading.Event()
+        ctx = get_current_context(silent=True)
+
+        def work():
+            # Like the other stages, workers see the context the
+            # pipeline runs in.
+            if ctx is not None:
+                push_context(ctx)
+            try:
+                while True:
+                    task = tasks.get()
+                    if task is None or stopped.is_set():
+                        break
+                    idx, batch = task
+                    try:
+                        results.put((idx, self.map_batch(batch), None))
+                    except BaseException as e:
+                        results.put((idx, None, e))
+            finally:
+                if ctx is not None:
+                    pop_context()
+
+        threads = []
+        for _ in range(self.workers):
+            thread = threading.Thread(target=work)
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+
+        batches = iter(batches)
+        exhausted = False
+        submitted = pending = next_idx = 0
+        done = {}
+        try:
+            while True:
+                while not exhausted and pending + len(done) < limit:
+                    try:
+                        batch = next(batches)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    tasks.put((submitted, batch))
+                    submitted += 1
+                    pending += 1
+                if not pending:
+                    break
+                idx, batch, error = results.get()
+                pending -= 1
+                if error is not None:
+                    raise error
+                if not self.ordered:
+                    yield batch
+                    continue
+                done[idx] = batch
+                while next_idx in done:
+                    yield done.pop(next_idx)
+                    next_idx += 1
+        finally:
+            stopped.set()
+            for thread in threads:
+                tasks.put(None)
+            for thread in threads:
+                thread.join()
+
+
+def _make_stage_decorator(make_stage, f):
+    def new_func(*args, **kwargs):
+        return make_stage(f, args, kwargs)
+    return update_wrapper(new_func, f)
+
+
+def processor(f=None, batched=False):
+    """把一个命令回调函数变成一个处理器阶段。被装饰的函数的第一参数是
+    上一个阶段生成的所有项目组成的迭代器，之后是命令的参数，函数要
+    生成新的项目。这替代了 ``imagepipe`` 示例中手写的装饰器::
+
+        @cli.command()
+        @click.option('--width', type=int)
+        @click.processor
+        def resize(items, width):
+            for item in items:
+                yield item.resize(width)
+
+    .. versionadded:: 8.0
+
+    :param f: 要装饰的函数。
+    :param batched: 如果设置成 `True` 的话，函数接收的是一批一批项目
+                    (列表) 组成的迭代器，并且也要生成列表，这样可以
+                    避免每个项目的开销。
+    """
+    def decorator(f):
+        return _make_stage_decorator(
+            lambda f, args, kwargs: _Processor(f, args, kwargs, batched), f)
+    if f is None:
+        return decorator
+    return decorator(f)
+
+
+def generator(f):
+    """把一个命令回调函数变成一个生成器阶段。被装饰的函数只接收命令
+    的参数，它生成的项目会跟在上一个阶段的所有项目后面::
+
+        @cli.command('open')
+        @click.argument('paths', nargs=-1)
+        @click.generator
+        def open_cmd(paths):
+            for path in paths:
+                yield load(path)
+
+    .. versionadded:: 8.0
+
+    :param f: 要装饰的函数。
+    """
+    return _make_stage_decorator(_Generator, f)
+
+
+def mapper(f=None, workers=None, ordered=True, queue_size=None):
+    """把一个命令回调函数变成一个映射阶段。被装饰的函数的第一参数是
+    一个项目，之后是命令的参数，函数返回映射后的项目。如果设置了
+    `workers` 的话，项目会一批一批地在多个线程里映射::
+
+        @cli.command()
+        @click.argument('url')
+        @click.mapper(workers=8, ordered=False)
+        def upload(item, url):
+            return post(url, item)
+
+    .. versionadded:: 8.0
+
+    :param f: 要装饰的函数。
+    :param workers: 映射项目的线程数量。默认值 `None` 表示在当前线程里
+                    映射。
+    :param ordered: 如果设置成 `False` 的话，一批项目映射完成后就传递给
+                    下一个阶段，而不是保持输入的顺序。
+    :param queue_size: 同时在处理中或等待传递的批次的最大数量。达到这个
+                       数量后，不再读取上一个阶段的项目。默认值是
+                       `workers` 的两倍。
+    """
+    def decorator(f):
+        return _make_stage_decorator(
+            lambda f, args, kwargs: _Mapper(f, args, kwargs, workers,
+                                            ordered, queue_size), f)
+    if f is None:
+        return decorator
+    return decorator(f)
+
+
+def run_pipeline(stages, items=(), batch_size=256):
+    """让项目流经一个锁链群组的子命令返回的所有阶段，返回最后一个阶段
+    生成的所有项目组成的迭代器。通常在群组的结果回调里使用::
+
+        @click.group(chain=True, invoke_without_command=True)
+        def cli():
+            pass
+
+        @cli.resultcallback()
+        def process(stages):
+            for item in click.run_pipeline(stages):
+                click.echo(item)
+
+    阶段可以是 :class:`PipelineStage` 对象，也可以是接收一个项目迭代器
+    并返回一个项目迭代器的函数 (旧的处理器写法) 。 `None` 会被忽略，
+    所以不属于管道的子命令可以不返回值。
+
+    注意，阶段运行的时候，子命令的语境已经关闭了，所以不要在阶段里
+    使用 :class:`File` 类型打开的文件。
+
+    .. versionadded:: 8.0
+
+    :param stages: 所有阶段组成的一个可迭代对象。
+    :param items: 输入第一个阶段的项目。
+    :param batch_size: 每批项目的最大数量。
+    """
+    batches = _iter_batches(items, batch_size)
+    for stage in stages:
+        if stage is None:
+            continue
+        if isinstance(stage, PipelineStage):
+            batches = stage.process(batches, batch_size)
+        elif callable(stage):
+            batches = _iter_batches(stage(_iter_items(batches)), batch_size)
+        else:
+            raise TypeError('%r is not a pipeline stage.' % (stage,))
+    return _iter_items(batches)
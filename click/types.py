@@ -1,11 +1,26 @@
 import os
+import re
 import stat
 from datetime import datetime
 
 from ._compat import open_stream, text_type, filename_to_ui, \
-    get_filesystem_encoding, get_streerror, _get_argv_encoding, PY2
+    get_filesystem_encoding, get_streerror, _get_argv_encoding, PY2, \
+    get_unbound_function
 from .exceptions import BadParameter
-from .utils import safecall, LazyFile
+from .utils import safecall, LazyFile, _LRUCache, _resolve_fsync
+from .parser import _normalize_token
+
+
+_missing = object()
+
+
+def _get_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError('NumPy is required to convert parameter values '
+                           'into arrays but it is not installed.')
+    return numpy
 
 
 class ParamType(object):
@@ -32,9 +47,38 @@ class ParamType(object):
     #: Windows).
     envvar_list_splitter = None
 
+    #: Marks the type as pure.  A pure type always converts equal values
+    #: to equal results and has no side effects, so its results may be
+    #: reused if the context has :attr:`~Context.cache_conversions`
+    #: enabled.  Custom types can set this to `True` to opt in.
+    #:
+    #: .. versionadded:: 8.0
+    pure = False
+
+    #: the NumPy dtype used when values of this type are converted into an
+    #: array.  `None` lets NumPy pick one.
+    array_dtype = None
+
     def __call__(self, value, param=None, ctx=None):
         if value is not None:
+            if self.pure and getattr(ctx, 'cache_conversions', False):
+                return self._cached_convert(value, param, ctx)
+            return self.convert(value, param, ctx)
+
+    def _cached_convert(self, value, param, ctx):
+        cache = ctx._conversion_cache
+        if cache is None:
+            cache = ctx._conversion_cache = _LRUCache()
+        # The value's class is part of the key as ``1``, ``1.0`` and
+        # ``True`` compare equal but do not necessarily convert alike.
+        key = (self, value.__class__, value)
+        try:
+            rv = cache.get(key, _missing)
+        except TypeError:
             return self.convert(value, param, ctx)
+        if rv is _missing:
+            rv = cache[key] = self.convert(value, param, ctx)
+        return rv
 
     def get_metavar(self, param):
         """Returns the metavar default for this param if it provides one."""
@@ -52,6 +96,24 @@ class ParamType(object):
         """
         return value
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        """Converts a sequence of values at once and returns a tuple with
+        the results, or a NumPy array if `as_array` is enabled.  This is
+        used for parameters that take more than one value.  The default
+        implementation converts the values one by one; types that can
+        convert in bulk should override it.
+
+        .. versionadded:: 8.0
+        """
+        rv = tuple(self(x, param, ctx) for x in values)
+        if as_array:
+            try:
+                rv = _get_numpy().array(rv, dtype=self.array_dtype)
+            except OverflowError:
+                self.fail('%s values do not fit into an array of %s.' % (
+                    self.name, self.array_dtype), param, ctx)
+        return rv
+
     def split_envvar_value(self, rv):
         """Given a value from an environment variable this splits it up
         into small chunks depending on the defined envvar list splitter.
@@ -67,6 +129,15 @@ class ParamType(object):
         raise BadParameter(message, ctx=ctx, param=param)
 
 
+def _converts_like(ty, cls):
+    """Checks that `ty` converts single values exactly like `cls` does,
+    only then may the bulk conversion of `cls` bypass :meth:`convert`.
+    """
+    t, f = type(ty), get_unbound_function
+    return f(t.convert) is f(cls.convert) \
+        and f(t.__call__) is f(ParamType.__call__)
+
+
 class CompositeParamType(ParamType):
     is_composite = True
 
@@ -130,6 +201,8 @@ class Choice(ParamType):
 
     你应该只采用列表或元组来作为代入的候选清单。
     其它可迭代对象 (例如生成器对象) 会导致意外结果。
+    候选清单会被复制成一个元组，所以之后修改原来的列表不会
+    有影响，要改变候选值的话给 `choices` 属性赋一个新值。
 
     查看 :ref:`choice-opts` 选择可选值文档中的示例。
 
@@ -138,11 +211,46 @@ class Choice(ParamType):
     """
 
     name = 'choice'
+    pure = True
 
     def __init__(self, choices, case_sensitive=True):
         self.choices = choices
         self.case_sensitive = case_sensitive
 
+    @property
+    def choices(self):
+        return self._choices
+
+    @choices.setter
+    def choices(self, value):
+        # A private copy, so the lookup tables cannot go stale when the
+        # list that was passed in is mutated.
+        self._choices = tuple(value)
+        # Lookup tables keyed by ``(normalize_func, case_sensitive)``.
+        # They are built on first use and dropped whenever the choices
+        # are replaced.
+        self._lookup_tables = {}
+
+    def _get_lookup_table(self, normalize_func, case_sensitive):
+        key = (normalize_func, case_sensitive)
+        rv = self._lookup_tables.get(key)
+        if rv is not None:
+            return rv
+
+        normed_choices = self.choices
+        if normalize_func is not None:
+            normed_choices = [normalize_func(choice) for choice in
+                              normed_choices]
+        if not case_sensitive:
+            normed_choices = [choice.lower() for choice in normed_choices]
+        rv = frozenset(normed_choices)
+
+        # Bounded like the normalization caches of the parser.
+        if len(self._lookup_tables) >= 8:
+            self._lookup_tables.clear()
+        self._lookup_tables[key] = rv
+        return rv
+
     def get_metavar(self, param):
         return '[%s]' % '|'.join(self.choices)
 
@@ -151,7 +259,7 @@ class Choice(ParamType):
 
     def convert(self, value, param, ctx):
         # Exact match
-        if value in self.choices:
+        if value in self._get_lookup_table(None, True):
             return value
 
         # Match through normalization and case sensitivity
@@ -159,19 +267,18 @@ class Choice(ParamType):
         # preserve original `value` to produce an accurate message in
         # `self.fail`
         normed_value = value
-        normed_choices = self.choices
+        normalize_func = None
 
         if ctx is not None and \
            ctx.token_normalize_func is not None:
-            normed_value = ctx.token_normalize_func(value)
-            normed_choices = [ctx.token_normalize_func(choice) for choice in
-                              self.choices]
+            normalize_func = ctx.token_normalize_func
+            normed_value = _normalize_token(value, normalize_func)
 
         if not self.case_sensitive:
             normed_value = normed_value.lower()
-            normed_choices = [choice.lower() for choice in normed_choices]
 
-        if normed_value in normed_choices:
+        if normed_value in self._get_lookup_table(normalize_func,
+                                                  self.case_sensitive):
             return normed_value
 
         self.fail('invalid choice: %s. (choose from %s)' %
@@ -181,6 +288,25 @@ class Choice(ParamType):
         return 'Choice(%r)' % list(self.choices)
 
 
+# Formats for which the accepted inputs are exactly the strings matching
+# the pattern.  For these the expensive ``strptime`` call can be skipped
+# and a simple pattern check plus ``fromisoformat`` (where available) is
+# used instead.  The patterns are mutually exclusive.
+_iso_formats = {
+    '%Y-%m-%d': re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}$'),
+    '%Y-%m-%dT%H:%M': re.compile(
+        r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}$'),
+    '%Y-%m-%d %H:%M': re.compile(
+        r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}$'),
+    '%Y-%m-%dT%H:%M:%S': re.compile(
+        r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}$'),
+    '%Y-%m-%d %H:%M:%S': re.compile(
+        r'[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}:[0-9]{2}$'),
+}
+
+_fromisoformat = getattr(datetime, 'fromisoformat', None)
+
+
 class DateTime(ParamType):
     """The DateTime type converts date strings into `datetime` objects.
 
@@ -194,7 +320,10 @@ class DateTime(ParamType):
     consequently defines the format strings which are allowed.
 
     Parsing is tried using each format, in order, and the first format which
-    parses successfully is used.
+    parses successfully is used.  If all formats are common ISO 8601
+    formats (as the defaults are) they cannot match the same input, so the
+    order is instead adapted to try the most frequently matching format
+    first.
 
     :param formats: A list or tuple of date format strings, in the order in
                     which they should be tried. Defaults to
@@ -202,6 +331,7 @@ class DateTime(ParamType):
                     ``'%Y-%m-%d %H:%M:%S'``.
     """
     name = 'datetime'
+    pure = True
 
     def __init__(self, formats=None):
         self.formats = formats or [
@@ -209,22 +339,54 @@ class DateTime(ParamType):
             '%Y-%m-%dT%H:%M:%S',
             '%Y-%m-%d %H:%M:%S'
         ]
+        self._format_order = list(self.formats)
+        self._format_hits = dict.fromkeys(self.formats, 0)
+        self._adaptive_order = all(f in _iso_formats for f in self.formats)
 
     def get_metavar(self, param):
         return '[{}]'.format('|'.join(self.formats))
 
     def _try_to_convert_date(self, value, format):
+        # Canonical ISO values skip strptime, anything else (for instance
+        # unpadded fields) is still parsed by it.
+        pattern = _iso_formats.get(format)
+        if pattern is not None and _fromisoformat is not None \
+           and pattern.match(value) is not None:
+            try:
+                return _fromisoformat(value)
+            except ValueError:
+                pass
         try:
             return datetime.strptime(value, format)
         except ValueError:
             return None
 
+    def _record_hit(self, format, idx):
+        hits = self._format_hits[format] = self._format_hits[format] + 1
+        order = self._format_order
+        # Move the format in front of the ones that matched less often.
+        # Other threads may be iterating the order, so a new list is
+        # swapped in instead of shifting the entries in place.
+        new_idx = idx
+        while new_idx > 0 and self._format_hits[order[new_idx - 1]] < hits:
+            new_idx -= 1
+        if new_idx != idx and order[idx] is format:
+            self._format_order = order[:new_idx] + [format] + \
+                order[new_idx:idx] + order[idx + 1:]
+
     def convert(self, value, param, ctx):
-        # Exact match
-        for format in self.formats:
-            dtime = self._try_to_convert_date(value, format)
-            if dtime:
-                return dtime
+        if self._adaptive_order:
+            for idx, format in enumerate(self._format_order):
+                dtime = self._try_to_convert_date(value, format)
+                if dtime:
+                    self._record_hit(format, idx)
+                    return dtime
+        else:
+            # Exact match
+            for format in self.formats:
+                dtime = self._try_to_convert_date(value, format)
+                if dtime:
+                    return dtime
 
         self.fail(
             'invalid datetime format: {}. (choose from {})'.format(
@@ -236,6 +398,9 @@ class DateTime(ParamType):
 
 class IntParamType(ParamType):
     name = 'integer'
+    pure = True
+
+    array_dtype = 'int64'
 
     def convert(self, value, param, ctx):
         try:
@@ -243,10 +408,64 @@ class IntParamType(ParamType):
         except (ValueError, UnicodeError):
             self.fail('%s is not a valid integer' % value, param, ctx)
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        if not _converts_like(self, IntParamType):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+        return self._bulk_convert(values, param, ctx, as_array)
+
+    def _bulk_convert(self, values, param, ctx, as_array):
+        try:
+            if as_array:
+                return _get_numpy().array(values, dtype=self.array_dtype)
+            return tuple(map(int, values))
+        except (TypeError, ValueError, UnicodeError, OverflowError):
+            # Go through the regular conversion to report the first bad
+            # value with the usual error message.
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+
     def __repr__(self):
         return 'INT'
 
 
+def _check_range_many(ty, rv, values, param, ctx, as_array):
+    """Applies the range check of `ty` (an :class:`IntRange` or
+    :class:`FloatRange`) to already converted values with a single pass
+    over the minimum and maximum instead of one check per value.
+    """
+    if not len(rv):
+        return rv
+    if not as_array and None in rv:
+        return tuple(ty(x, param, ctx) for x in values)
+
+    if ty.clamp:
+        if as_array:
+            if ty.min is not None or ty.max is not None:
+                _get_numpy().clip(rv, ty.min, ty.max, out=rv)
+            return rv
+        lo, hi = ty.min, ty.max
+        return tuple(lo if lo is not None and x < lo else
+                     hi if hi is not None and x > hi else x for x in rv)
+
+    if as_array:
+        numpy = _get_numpy()
+        too_small = ty.min is not None and numpy.any(rv < ty.min)
+        too_big = ty.max is not None and numpy.any(rv > ty.max)
+    elif rv[0] != rv[0]:
+        # A leading NaN would stick as result of min() and max(), as no
+        # value compares smaller or bigger than it.
+        too_small = too_big = True
+    else:
+        too_small = ty.min is not None and min(rv) < ty.min
+        too_big = ty.max is not None and max(rv) > ty.max
+
+    if too_small or too_big:
+        # Convert the first offending value again so that the error is
+        # reported exactly like for single values.
+        for x in rv:
+            ty.convert(x, param, ctx)
+    return rv
+
+
 class IntRange(IntParamType):
     """一种类似 :data:`click.INT` 的数据类型，但把值限制在一个范围里。
     如果值超出范围的话，默认行为会失败，但也可以把超出范围但值固定成边缘值。
@@ -280,12 +499,21 @@ class IntRange(IntParamType):
                           % (rv, self.min, self.max), param, ctx)
         return rv
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        if not _converts_like(self, IntRange):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+        rv = self._bulk_convert(values, param, ctx, as_array)
+        return _check_range_many(self, rv, values, param, ctx, as_array)
+
     def __repr__(self):
         return 'IntRange(%r, %r)' % (self.min, self.max)
 
 
 class FloatParamType(ParamType):
     name = 'float'
+    pure = True
+
+    array_dtype = 'float64'
 
     def convert(self, value, param, ctx):
         try:
@@ -294,6 +522,19 @@ class FloatParamType(ParamType):
             self.fail('%s is not a valid floating point value' %
                       value, param, ctx)
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        if not _converts_like(self, FloatParamType):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+        return self._bulk_convert(values, param, ctx, as_array)
+
+    def _bulk_convert(self, values, param, ctx, as_array):
+        try:
+            if as_array:
+                return _get_numpy().array(values, dtype=self.array_dtype)
+            return tuple(map(float, values))
+        except (TypeError, ValueError, UnicodeError, OverflowError):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+
     def __repr__(self):
         return 'FLOAT'
 
@@ -331,12 +572,19 @@ class FloatRange(FloatParamType):
                           % (rv, self.min, self.max), param, ctx)
         return rv
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        if not _converts_like(self, FloatRange):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+        rv = self._bulk_convert(values, param, ctx, as_array)
+        return _check_range_many(self, rv, values, param, ctx, as_array)
+
     def __repr__(self):
         return 'FloatRange(%r, %r)' % (self.min, self.max)
 
 
 class BoolParamType(ParamType):
     name = 'boolean'
+    pure = True
 
     def convert(self, value, param, ctx):
         if isinstance(value, bool):
@@ -354,6 +602,7 @@ class BoolParamType(ParamType):
 
 class UUIDParameterType(ParamType):
     name = 'uuid'
+    pure = True
 
     def convert(self, value, param, ctx):
         import uuid
@@ -384,18 +633,75 @@ class File(ParamType):
     从 Click 2.0 开始，文件也可以自动地打开，这种情况下所有写入都会进入相同文件夹里的单个文件，
     并且直到完成文件会被移动到原始位置。如果一个文件常规地由其它用户修改的话，这是有用的。
 
+    从 Click 8.0 开始，用 ``'rb'`` 模式打开的文件可以设置 `mmap` 旗语，
+    这时返回的是一个只读的 :class:`mmap.mmap` 内存映射对象，可以不带
+    复制地切片，也可以像流数据一样读取。对于 ``-`` 、管道和空文件这些
+    无法内存映射的情况，返回的依然是常规的流数据。
+
+    从 Click 8.0 开始， `compression` 参数可以透明地压缩或解压文件，
+    包括 ``-`` 、懒蛋模式和原子价模式。可以是 ``'gzip'`` 、 ``'bz2'``
+    或 ``'xz'`` 。设置成 ``'auto'`` 的话，读取时通过魔法字节来检测，
+    写入时通过文件扩展名来决定。数据都是以流的方式处理的。
+
+    从 Click 8.0 开始， `buffering` 参数可以设置文件缓冲区的字节大小，
+    与内置的 :func:`open` 函数一样。原子价模式的文件可以设置 `fsync`
+    参数，在移动到原始位置之前把文件和所在文件夹同步到磁盘上。设置成
+    ``'batch'`` 的话，一条命令写入的所有文件都会等到根语境关闭时一起
+    同步到磁盘上并移动到原始位置，这样在写入很多文件时既持久又快速。
+
+    从 Click 8.0 开始，为读取打开的文件可以设置 `prefetch` 参数，
+    文件打开后会在一个后台线程里预先读取这么多块数据到一个有限的缓冲区
+    里，这样在命令回调函数处理数据的同时，下一块数据已经在读取了。
+    非懒蛋模式的文件在转换时就开始预先读取。
+
     阅读 :ref:`file-args` 参考文档了解更多信息。
     """
     name = 'filename'
     envvar_list_splitter = os.path.pathsep
 
     def __init__(self, mode='r', encoding=None, errors='strict', lazy=None,
-                 atomic=False):
+                 atomic=False, mmap=False, compression=None, buffering=-1,
+                 fsync=False, prefetch=0):
         self.mode = mode
         self.encoding = encoding
         self.errors = errors
         self.lazy = lazy
         self.atomic = atomic
+        self.mmap = mmap
+        self.compression = compression
+        self.buffering = buffering
+        self.fsync = fsync
+        self.prefetch = prefetch
+        if fsync not in (False, True, 'batch'):
+            raise ValueError('fsync must be a boolean or \'batch\'.')
+        if fsync and not atomic:
+            raise ValueError('Syncing to disk is only supported for atomic '
+                             'writes.')
+        if mmap and set(mode) != set('rb'):
+            raise ValueError('Memory mapping is only supported for files '
+                             'opened in \'rb\' mode.')
+        if mmap and compression is not None:
+            raise ValueError('Compressed files cannot be memory mapped.')
+        if prefetch and (mmap or any(m in mode for m in 'wax+')):
+            raise ValueError('Prefetching is only supported for files '
+                             'opened for reading as streams.')
+
+    def _open_mmap(self, value):
+        """Opens the file as a read-only memory map.  Files that cannot be
+        mapped (pipes, devices and empty files) are returned as regular
+        streams instead.
+        """
+        import mmap
+        f = open(value, 'rb')
+        try:
+            rv = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            return f
+        except BaseException:
+            f.close()
+            raise
+        f.close()
+        return rv
 
     def resolve_lazy_flag(self, value):
         if self.lazy is not None:
@@ -411,18 +717,32 @@ class File(ParamType):
             if hasattr(value, 'read') or hasattr(value, 'write'):
                 return value
 
+            if self.mmap and value != '-':
+                f = self._open_mmap(value)
+                if ctx is not None:
+                    ctx.call_on_close(safecall(f.close))
+                return f
+
             lazy = self.resolve_lazy_flag(value)
 
             if lazy:
                 f = LazyFile(value, self.mode, self.encoding, self.errors,
-                             atomic=self.atomic)
+                             atomic=self.atomic,
+                             compression=self.compression,
+                             buffering=self.buffering, fsync=self.fsync,
+                             prefetch=self.prefetch)
                 if ctx is not None:
                     ctx.call_on_close(f.close_intelligently)
                 return f
 
             f, should_close = open_stream(value, self.mode,
                                           self.encoding, self.errors,
-                                          atomic=self.atomic)
+                                          atomic=self.atomic,
+                                          compression=self.compression,
+                                          buffering=self.buffering,
+                                          fsync=_resolve_fsync(self.fsync,
+                                                               ctx),
+                                          prefetch=self.prefetch)
             # If a context is provided, we automatically close the file
             # at the end of the context execution (or flush out).  If a
             # context does not exist, it's the caller's responsibility to
@@ -441,6 +761,129 @@ class File(ParamType):
             ), param, ctx)
 
 
+class Array(ParamType):
+    """把一个参数形式声明成一个数字数据文件，值是一个 NumPy 数组。
+    需要安装 NumPy 库。特殊值 ``-`` 代表标准输入。
+
+    ``.npy`` 文件和原始二进制文件都是通过 :class:`numpy.memmap`
+    内存映射来打开的，所以大文件不会全部读入到内存里。文本文件是
+    一块一块地进行语法分析的，每行一条记录，每列用 `delimiter`
+    分隔。标准输入不能内存映射，所以会被读进内存里。
+
+    .. versionadded:: 8.0
+
+    :param format: 文件格式。可以是 ``'npy'`` 、 ``'raw'`` 或
+                   ``'text'`` 。默认值是 `None` 意思是如果文件以
+                   ``.npy`` 魔法字节开头就是 ``'npy'`` 格式，
+                   否则是 ``'text'`` 格式。原始二进制格式必须明确写出来。
+    :param dtype: 原始二进制文件和文本文件的数据类型。
+                  ``.npy`` 文件自己保存了数据类型。
+    :param shape: 原始二进制文件的形状。默认是一维数组。
+    :param mmap_mode: 内存映射的模式，例如 ``'r'`` (只读) 或
+                      ``'c'`` (写时复制)。设置成 `None` 的话，
+                      会把文件读进内存里。
+    :param delimiter: 文本文件中列的分隔符。默认值 `None` 是空白字符。
+    :param encoding: 文本文件的编码。
+    :param chunk_size: 文本文件每次进行语法分析的行数。
+    """
+    name = 'filename'
+    envvar_list_splitter = os.path.pathsep
+
+    def __init__(self, format=None, dtype='float64', shape=None,
+                 mmap_mode='r', delimiter=None, encoding=None,
+                 chunk_size=65536):
+        if format not in (None, 'npy', 'raw', 'text'):
+            raise ValueError('Unknown array format %r' % format)
+        self.format = format
+        self.dtype = dtype
+        self.shape = shape
+        self.mmap_mode = mmap_mode
+        self.delimiter = delimiter
+        self.encoding = encoding
+        self.chunk_size = chunk_size
+
+    def resolve_format(self, value):
+        if self.format is not None:
+            return self.format
+        numpy = _get_numpy()
+        if value == '-':
+            return 'text'
+        with open(value, 'rb') as f:
+            magic = f.read(len(numpy.lib.format.MAGIC_PREFIX))
+        if magic == numpy.lib.format.MAGIC_PREFIX:
+            return 'npy'
+        return 'text'
+
+    def _load_npy(self, value):
+        numpy = _get_numpy()
+        if value == '-':
+            return numpy.lib.format.read_array(open_stream(value, 'rb')[0])
+        return numpy.load(value, mmap_mode=self.mmap_mode)
+
+    def _load_raw(self, value):
+        numpy = _get_numpy()
+        if value == '-':
+            f = open_stream(value, 'rb')[0]
+            rv = numpy.frombuffer(f.read(), dtype=self.dtype)
+        elif self.mmap_mode is None or os.path.getsize(value) == 0:
+            # Empty files cannot be memory mapped.
+            rv = numpy.fromfile(value, dtype=self.dtype)
+        else:
+            return numpy.memmap(value, dtype=self.dtype,
+                                mode=self.mmap_mode,
+                                shape=self.shape)
+        if self.shape is not None:
+            rv = rv.reshape(self.shape)
+        return rv
+
+    def _load_text(self, value):
+        import warnings
+        from itertools import islice
+        numpy = _get_numpy()
+        f, should_close = open_stream(value, 'r', self.encoding)
+        try:
+            chunks = []
+            while 1:
+                lines = list(islice(f, self.chunk_size))
+                if not lines:
+                    break
+                with warnings.catch_warnings():
+                    # Chunks with only comments or blank lines are fine.
+                    warnings.simplefilter('ignore')
+                    chunk = numpy.loadtxt(lines, dtype=self.dtype,
+                                          delimiter=self.delimiter,
+                                          ndmin=2)
+                if chunk.size:
+                    chunks.append(chunk)
+        finally:
+            if should_close:
+                f.close()
+        if not chunks:
+            return numpy.empty((0,), dtype=self.dtype)
+        rv = numpy.concatenate(chunks)
+        if rv.shape[1] == 1:
+            rv = rv.reshape(-1)
+        return rv
+
+    def convert(self, value, param, ctx):
+        if hasattr(value, 'shape') and hasattr(value, 'dtype'):
+            return value
+        try:
+            format = self.resolve_format(value)
+            return getattr(self, '_load_' + format)(value)
+        except (IOError, OSError) as e:
+            self.fail('Could not open file: %s: %s' % (
+                filename_to_ui(value),
+                get_streerror(e),
+            ), param, ctx)
+        except ValueError as e:
+            self.fail('Could not read array from %s: %s' % (
+                filename_to_ui(value), e), param, ctx)
+
+    def __repr__(self):
+        return 'Array(%r)' % (self.format or 'auto')
+
+
 class Path(ParamType):
     """路径类型类似 :class:`File` 文件类型，但执行了不同的检查。
     首先，代替返回一个打开的文件处理，而只是返回文件名。
@@ -466,6 +909,13 @@ class Path(ParamType):
     """
     envvar_list_splitter = os.path.pathsep
 
+    #: the number of threads used to check many paths at once.
+    stat_workers = 16
+
+    #: the number of distinct unchecked paths from which on they are
+    #: checked by :meth:`convert_many` on a thread pool.
+    concurrent_stat_threshold = 32
+
     def __init__(self, exists=False, file_okay=True, dir_okay=True,
                  writable=False, readable=True, resolve_path=False,
                  allow_dash=False, path_type=None):
@@ -496,48 +946,151 @@ class Path(ParamType):
                 rv = rv.encode(get_filesystem_encoding())
         return rv
 
-    def convert(self, value, param, ctx):
+    def _stat_path(self, value):
+        """Collects the file system information needed to validate a
+        value.  Returns a tuple in the form ``(rv, st_mode, writable,
+        readable)`` where `st_mode` is `None` if the path does not exist.
+        """
         rv = value
+        if self.resolve_path:
+            rv = os.path.realpath(rv)
+        try:
+            st = os.stat(rv)
+        except OSError:
+            return rv, None, None, None
+        return (rv, st.st_mode,
+                self.writable and os.access(value, os.W_OK),
+                self.readable and os.access(value, os.R_OK))
+
+    def _stat_paths(self, values):
+        return [self._stat_path(value) for value in values]
+
+    def _stat_concurrently(self, values):
+        """Calls :meth:`_stat_path` for many values on a thread pool.
+        Returns an empty list if no pool is available (Python 2 or no
+        threads), the values are then checked one by one.
+        """
+        try:
+            from concurrent.futures import ThreadPoolExecutor
+        except ImportError:
+            return []
+        # Every worker gets a few chunks, but a chunk is never so small
+        # that starting a thread for it costs more than it saves.
+        size = max(8, len(values) // (self.stat_workers * 4))
+        chunks = [values[i:i + size] for i in range(0, len(values), size)]
+        try:
+            executor = ThreadPoolExecutor(min(self.stat_workers,
+                                              len(chunks)))
+            with executor:
+                results = list(executor.map(self._stat_paths, chunks))
+        except (OSError, RuntimeError):
+            # Threads cannot be started on this platform.
+            return []
+        return [info for chunk in results for info in chunk]
+
+    def _get_stat_cache(self, ctx):
+        if ctx is None:
+            return None
+        return ctx.meta.setdefault(__name__ + '.path_stats', {})
+
+    def _stat_key(self, value):
+        return (value, self.resolve_path, self.writable, self.readable)
+
+    def _cached_stat_path(self, value, cache):
+        if cache is None:
+            return self._stat_path(value)
+        key = self._stat_key(value)
+        rv = cache.get(key)
+        if rv is None:
+            rv = cache[key] = self._stat_path(value)
+        return rv
 
-        is_dash = self.file_okay and self.allow_dash and rv in (b'-', '-')
+    def _check_path(self, value, info):
+        """Validates a value against the result of :meth:`_stat_path`.
+        Returns the converted value and an error message or `None`.
+        """
+        rv, st_mode, writable, readable = info
+        if st_mode is None:
+            if not self.exists:
+                return rv, None
+            problem = 'does not exist'
+        elif not self.file_okay and stat.S_ISREG(st_mode):
+            problem = 'is a file'
+        elif not self.dir_okay and stat.S_ISDIR(st_mode):
+            problem = 'is a directory'
+        elif self.writable and not writable:
+            problem = 'is not writable'
+        elif self.readable and not readable:
+            problem = 'is not readable'
+        else:
+            return rv, None
+        return rv, '%s "%s" %s.' % (self.path_type, filename_to_ui(value),
+                                    problem)
 
-        if not is_dash:
-            if self.resolve_path:
-                rv = os.path.realpath(rv)
+    def _is_dash(self, value):
+        return self.file_okay and self.allow_dash and value in (b'-', '-')
 
-            try:
-                st = os.stat(rv)
-            except OSError:
-                if not self.exists:
-                    return self.coerce_path_result(rv)
-                self.fail('%s "%s" does not exist.' % (
-                    self.path_type,
-                    filename_to_ui(value)
-                ), param, ctx)
-
-            if not self.file_okay and stat.S_ISREG(st.st_mode):
-                self.fail('%s "%s" is a file.' % (
-                    self.path_type,
-                    filename_to_ui(value)
-                ), param, ctx)
-            if not self.dir_okay and stat.S_ISDIR(st.st_mode):
-                self.fail('%s "%s" is a directory.' % (
-                    self.path_type,
-                    filename_to_ui(value)
-                ), param, ctx)
-            if self.writable and not os.access(value, os.W_OK):
-                self.fail('%s "%s" is not writable.' % (
-                    self.path_type,
-                    filename_to_ui(value)
-                ), param, ctx)
-            if self.readable and not os.access(value, os.R_OK):
-                self.fail('%s "%s" is not readable.' % (
-                    self.path_type,
-                    filename_to_ui(value)
-                ), param, ctx)
+    def convert(self, value, param, ctx):
+        rv = value
+
+        if not self._is_dash(value):
+            info = self._cached_stat_path(value, self._get_stat_cache(ctx))
+            rv, message = self._check_path(value, info)
+            if message is not None:
+                self.fail(message, param, ctx)
 
         return self.coerce_path_result(rv)
 
+    def convert_many(self, values, param=None, ctx=None, as_array=False):
+        # Subclasses that preprocess values in convert() are checked
+        # one by one.
+        if not _converts_like(self, Path):
+            return ParamType.convert_many(self, values, param, ctx, as_array)
+        cache = self._get_stat_cache(ctx)
+        if cache is None:
+            cache = {}
+
+        # Every distinct path is checked once.  Many paths are checked
+        # concurrently as most of the time is spent waiting for the file
+        # system (which helps a lot on network file systems).
+        pending = []
+        seen = set()
+        for value in values:
+            if value is None or self._is_dash(value) or value in seen:
+                continue
+            seen.add(value)
+            if self._stat_key(value) not in cache:
+                pending.append(value)
+
+        if len(pending) >= self.concurrent_stat_threshold:
+            for value, info in zip(pending, self._stat_concurrently(pending)):
+                cache[self._stat_key(value)] = info
+
+        rv = []
+        errors = []
+        for value in values:
+            if value is None:
+                rv.append(None)
+            elif self._is_dash(value):
+                rv.append(self.coerce_path_result(value))
+            else:
+                info = self._cached_stat_path(value, cache)
+                path, message = self._check_path(value, info)
+                if message is not None:
+                    if message not in errors:
+                        errors.append(message)
+                    continue
+                rv.append(self.coerce_path_result(path))
+
+        # Report all problems at once instead of only the first one.
+        if errors:
+            self.fail('\n'.join(errors), param, ctx)
+
+        rv = tuple(rv)
+        if as_array:
+            rv = _get_numpy().array(rv)
+        return rv
+
 
 class Tuple(CompositeParamType):
     """Click 的默认行为是直接把一个类型作用在一个值上。
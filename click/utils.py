@@ -1,12 +1,17 @@
+import io
 import os
 import sys
+import errno
+from collections import OrderedDict
+from functools import update_wrapper
 
 from .globals import resolve_color_default
 
 from ._compat import text_type, open_stream, get_filesystem_encoding, \
     get_streerror, string_types, PY2, binary_streams, text_streams, \
-    filename_to_ui, auto_wrap_for_ansi, strip_ansi, should_strip_ansi, \
-    _default_text_stdout, _default_text_stderr, is_bytes, WIN
+    iteritems, filename_to_ui, auto_wrap_for_ansi, strip_ansi, \
+    should_strip_ansi, _default_text_stdout, _default_text_stderr, \
+    is_bytes, WIN, _FsyncBatch
 
 if not PY2:
     from ._compat import _find_binary_writer
@@ -67,6 +72,61 @@ def make_default_short_help(help, max_length=45):
     return ''.join(result)
 
 
+class _LRUCache(object):
+    """A small dictionary-like cache that evicts the least recently used
+    entries once more than `maxsize` items are stored.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+
+    def get(self, key, default=None):
+        try:
+            rv = self._data.pop(key)
+        except KeyError:
+            return default
+        self._data[key] = rv
+        return rv
+
+    def __setitem__(self, key, value):
+        self._data.pop(key, None)
+        self._data[key] = value
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+
+
+def _resolve_fsync(fsync, ctx=None):
+    """Resolves ``fsync='batch'`` to the batch of the root context, which
+    is committed when the root context is closed.  Without a context the
+    file is synced on close instead.
+    """
+    if fsync != 'batch':
+        return fsync
+    if ctx is None:
+        from .globals import get_current_context
+        ctx = get_current_context(silent=True)
+        if ctx is None:
+            return True
+    ctx = ctx.find_root()
+    key = __name__ + '.fsync_batch'
+    batch = ctx.meta.get(key)
+    if batch is None:
+        # Files are usually added while the close callbacks are running,
+        # and the commit appended then still runs after them.
+        batch = ctx.meta[key] = _FsyncBatch(ctx.call_on_close)
+    return batch
+
+
 class LazyFile(object):
     """A lazy file works like a regular file but it does not fully open
     the file but it does perform some basic checks early to see if the
@@ -75,16 +135,22 @@ class LazyFile(object):
     """
 
     def __init__(self, filename, mode='r', encoding=None, errors='strict',
-                 atomic=False):
+                 atomic=False, compression=None, buffering=-1, fsync=False,
+                 prefetch=0):
         self.name = filename
         self.mode = mode
         self.encoding = encoding
         self.errors = errors
         self.atomic = atomic
+        self.compression = compression
+        self.buffering = buffering
+        self.fsync = fsync
+        self.prefetch = prefetch
 
         if filename == '-':
-            self._f, self.should_close = open_stream(filename, mode,
-                                                     encoding, errors)
+            self._f, self.should_close = open_stream(
+                filename, mode, encoding, errors, compression=compression,
+                prefetch=prefetch)
         else:
             if 'r' in mode:
                 # Open and close the file in case we're opening it for
@@ -113,7 +179,12 @@ class LazyFile(object):
             rv, self.should_close = open_stream(self.name, self.mode,
                                                 self.encoding,
                                                 self.errors,
-                                                atomic=self.atomic)
+                                                atomic=self.atomic,
+                                                compression=self.compression,
+                                                buffering=self.buffering,
+                                                fsync=_resolve_fsync(
+                                                    self.fsync),
+                                                prefetch=self.prefetch)
         except (IOError, OSError) as e:
             from .exceptions import FileError
             raise FileError(self.name, hint=get_streerror(e))
@@ -291,7 +362,8 @@ def get_text_stream(name, encoding=None, errors='strict'):
 
 
 def open_file(filename, mode='r', encoding=None, errors='strict',
-              lazy=False, atomic=False):
+              lazy=False, atomic=False, compression=None, buffering=-1,
+              fsync=False, prefetch=0):
     """本函数类似 :class:`File` 类的工作，但手动来使用。
     默认文件都是非懒蛋模式打开的。本函数可以把常规文件打开成
     标准输入/标准输出，当然是以 ``'-'`` 作为文件名的时候。
@@ -312,16 +384,375 @@ def open_file(filename, mode='r', encoding=None, errors='strict',
     :param lazy: 是否采用懒蛋模式打开文件。
     :param atomic: 以原子价模式写文件会进入一个临时文件，
                    并且直到文件关闭。
+    :param compression: 透明地压缩或解压文件。可以是 ``'gzip'`` 、
+                        ``'bz2'`` 或 ``'xz'`` 。设置成 ``'auto'`` 的话，
+                        读取时通过魔法字节来检测，写入时通过文件扩展名
+                        来决定。默认值 `None` 不进行压缩处理。
+
+    :param buffering: 文件缓冲区的字节大小，与内置的 :func:`open` 函数
+                      一样。默认值 ``-1`` 使用系统默认的大小。
+    :param fsync: 原子价模式写入时，在把临时文件移动到原始位置之前，
+                  是否把文件和所在文件夹同步到磁盘上。设置成
+                  ``'batch'`` 的话，文件关闭时先不移动，而是等到
+                  根语境关闭时一起同步到磁盘上并移动到原始位置。
+    :param prefetch: 读取文件时，在后台线程里预先读取的数据块数量。
+                     这样读取工作与处理数据的工作是重叠进行的。
+                     每块数据的大小是 `buffering` 的值，或者是 64 KiB 。
+                     默认值 ``0`` 不预先读取数据。
+
+    .. versionadded:: 8.0
+       其中增加了 `compression` 、 `buffering` 、 `fsync` 和
+       `prefetch` 参数。
     """
     if lazy:
-        return LazyFile(filename, mode, encoding, errors, atomic=atomic)
+        return LazyFile(filename, mode, encoding, errors, atomic=atomic,
+                        compression=compression, buffering=buffering,
+                        fsync=fsync, prefetch=prefetch)
     f, should_close = open_stream(filename, mode, encoding, errors,
-                                  atomic=atomic)
+                                  atomic=atomic, compression=compression,
+                                  buffering=buffering,
+                                  fsync=_resolve_fsync(fsync),
+                                  prefetch=prefetch)
     if not should_close:
         f = KeepOpenFile(f)
     return f
 
 
+_fd_readers = (io.FileIO, io.BufferedReader, io.BufferedRandom)
+_fd_writers = (io.FileIO, io.BufferedWriter, io.BufferedRandom)
+
+#: errors from ``sendfile`` and ``splice`` which mean that the kernel
+#: cannot copy between these two kinds of file descriptors.
+_fd_copy_unsupported = frozenset((errno.EINVAL, errno.ENOSYS, errno.EXDEV,
+                                  errno.ENOTSOCK, errno.EOPNOTSUPP,
+                                  errno.EBADF))
+
+
+def _unwrap_file(f):
+    """Strips the wrappers Click puts around files so that the actual
+    file object (and with it the file descriptor) can be used.
+    """
+    from ._compat import _AtomicFile
+    while True:
+        if isinstance(f, LazyFile):
+            f = f.open()
+        elif isinstance(f, (KeepOpenFile, _AtomicFile)):
+            f = f._file if isinstance(f, KeepOpenFile) else f._f
+        else:
+            return f
+
+
+def _get_fd(f, kinds):
+    if not isinstance(f, kinds) or f.closed:
+        return None
+    try:
+        return f.fileno()
+    except (AttributeError, IOError, OSError, ValueError):
+        return None
+
+
+def _sync_position(f, fd):
+    # The buffered file objects cache the position of the descriptor, which
+    # was moved behind their back.
+    try:
+        if f.seekable():
+            f.seek(os.lseek(fd, 0, os.SEEK_CUR))
+    except (IOError, OSError, ValueError):
+        pass
+
+
+def _copy_fd(in_fd, out_fd, length, progress):
+    """Copies between two file descriptors in the kernel.  Returns the
+    number of bytes copied or `None` if the kernel cannot copy between
+    these descriptors, in which case nothing was copied.
+    """
+    import stat
+
+    funcs = []
+    sendfile = getattr(os, 'sendfile', None)
+    if sendfile is not None:
+        funcs.append(lambda n: sendfile(out_fd, in_fd, None, n))
+    splice = getattr(os, 'splice', None)
+    if splice is not None and (
+            stat.S_ISFIFO(os.fstat(in_fd).st_mode) or
+            stat.S_ISFIFO(os.fstat(out_fd).st_mode)):
+        funcs.append(lambda n: splice(in_fd, out_fd, n))
+
+    chunk_size = 1 << 30
+    for func in funcs:
+        total = 0
+        while length is None or total < length:
+            n = chunk_size if length is None else min(chunk_size,
+                                                      length - total)
+            try:
+                copied = func(n)
+            except (OSError, TypeError) as e:
+                if total == 0 and (isinstance(e, TypeError) or
+                                   e.errno in _fd_copy_unsupported):
+                    break
+                raise
+            if not copied:
+                return total
+            total += copied
+            if progress is not None:
+                progress(copied)
+        else:
+            return total
+        if total:
+            return total
+    return None
+
+
+def copy_stream(src, dst, length=None, buffer_size=1024 * 1024,
+                progress=None):
+    """把二进制文件或流数据 ``src`` 的内容复制到 ``dst`` 中，返回的是
+    复制的字节数。
+
+    如果两端都是真实的文件描述符的话，例如常规文件、管道、或
+    :func:`get_binary_stream` 返回的 ``'stdin'`` 和 ``'stdout'`` ，
+    复制工作会由 ``os.sendfile`` 或 ``os.splice`` 在内核中完成，
+    数据不经过 Python 层面。其它情况都使用一个可重复使用的缓冲区
+    和 ``readinto`` 来复制。 ::
+
+        @click.command()
+        @click.argument('src', type=click.File('rb'))
+        @click.argument('dst', type=click.File('wb'))
+        def cli(src, dst):
+            with click.progressbar(length=os.fstat(src.fileno()).st_size) as bar:
+                click.copy_stream(src, dst, progress=bar)
+
+    .. versionadded:: 8.0
+
+    :param src: 以二进制模式打开的来源文件对象。
+    :param dst: 以二进制模式打开的目标文件对象。
+    :param length: 最多复制的字节数。默认值 `None` 会一直复制到
+                   ``src`` 的结尾。
+    :param buffer_size: 无法在内核中复制时所用的缓冲区大小。
+    :param progress: 每复制一块数据时都会用复制的字节数来调用的
+                     可调用对象，或者是一个 :func:`progressbar`
+                     进度条，会调用它的 ``update`` 方法。
+    """
+    if progress is not None and hasattr(progress, 'update'):
+        progress = progress.update
+
+    total = 0
+    src = _unwrap_file(src)
+    dst = _unwrap_file(dst)
+    in_fd = _get_fd(src, _fd_readers)
+    out_fd = _get_fd(dst, _fd_writers)
+
+    if in_fd is not None and out_fd is not None:
+        # Data already read into the buffer of the source is not visible
+        # to the kernel, so it is written out first.
+        if not isinstance(src, io.FileIO):
+            pending = src.peek(1)
+            if length is not None:
+                pending = pending[:length]
+            if pending:
+                dst.write(src.read(len(pending)))
+                total += len(pending)
+                if progress is not None:
+                    progress(len(pending))
+        dst.flush()
+        if length is not None and total >= length:
+            return total
+
+        copied = _copy_fd(in_fd, out_fd,
+                          None if length is None else length - total,
+                          progress)
+        if copied is not None:
+            _sync_position(src, in_fd)
+            _sync_position(dst, out_fd)
+            return total + copied
+
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    readinto = getattr(src, 'readinto', None)
+    while length is None or total < length:
+        n = buffer_size if length is None else min(buffer_size,
+                                                   length - total)
+        if readinto is not None:
+            read = readinto(view[:n])
+            chunk = view[:read or 0]
+        else:
+            chunk = src.read(n)
+            read = len(chunk)
+        if not read:
+            break
+        dst.write(chunk)
+        total += read
+        if progress is not None:
+            progress(read)
+    return total
+
+
+def _iter_split_chunks(file, sep, chunk_size=1024 * 1024, encoding=None,
+                       errors='strict', keepends=False):
+    """Implements :func:`iter_line_chunks` for any single character
+    separator.
+    """
+    read = file.read
+    binary = isinstance(read(0), bytes)
+    decoder = None
+    if binary and encoding is not None:
+        import codecs
+        decoder = codecs.getincrementaldecoder(encoding)(errors)
+        binary = False
+    if isinstance(sep, bytes):
+        sep = sep.decode('ascii')
+    if binary:
+        sep = sep.encode('ascii')
+    tail = sep[:0]
+
+    while True:
+        block = read(chunk_size)
+        if not block:
+            break
+        if decoder is not None:
+            block = decoder.decode(block)
+        idx = block.rfind(sep)
+        if idx < 0:
+            tail += block
+            continue
+        parts = (tail + block[:idx]).split(sep)
+        tail = block[idx + 1:]
+        if keepends:
+            parts = [part + sep for part in parts]
+        yield parts
+
+    if decoder is not None:
+        tail += decoder.decode(b'', True)
+    if tail:
+        yield [tail]
+
+
+class _CachedDefault(object):
+
+    def __init__(self, func, ttl=None, path=None, label=None):
+        self.func = func
+        self.ttl = ttl
+        self.path = path
+        self.label = label
+        self._value = None
+        self._time = None
+        update_wrapper(self, func)
+
+    def _is_fresh(self, timestamp, now):
+        return self.ttl is None or now - timestamp < self.ttl
+
+    def _load(self, now):
+        import json
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if self._is_fresh(data['time'], now):
+                return data['time'], data['value']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _store(self, now, value):
+        import json
+        try:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            with open_file(self.path, 'w', atomic=True) as f:
+                json.dump({'time': now, 'value': value}, f)
+        except (IOError, OSError, TypeError, ValueError):
+            # The value is still used if it cannot be cached on disk.
+            pass
+
+    def __call__(self):
+        import time
+        now = time.time()
+        if self._time is not None and self._is_fresh(self._time, now):
+            return self._value
+        cached = self.path is not None and self._load(now)
+        if cached:
+            self._time, self._value = cached
+            return self._value
+        value = self.func()
+        if self.path is not None:
+            self._store(now, value)
+        self._time, self._value = now, value
+        return value
+
+    def invalidate(self):
+        """Forgets the cached value, in memory and on disk."""
+        self._time = self._value = None
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def cached_default(func=None, ttl=None, path=None, label=None):
+    """装饰一个计算参数形式默认值的可调用对象，缓存计算结果。
+    可调用的默认值本来就在每个语境里只调用一次，而这个装饰器
+    把结果缓存到进程之间，适用于读取配置或查询元数据这类很慢的
+    默认值提供者。 ::
+
+        @click.command()
+        @click.option('--branch', show_default=True,
+                      default=click.cached_default(
+                          current_branch, ttl=60, label='current branch',
+                          path=os.path.join(click.get_app_dir('foo'),
+                                            'branch.json')))
+        def cli(branch):
+            ...
+
+    也可以不带参数作为装饰器来使用，这时结果会一直缓存在内存里。
+
+    .. versionadded:: 8.0
+
+    :param func: 计算默认值的可调用对象，不接受参数。
+    :param ttl: 缓存结果的有效秒数。默认值 `None` 表示一直有效。
+    :param path: 一个 JSON 文件的路径，结果会同时缓存到这个文件里，
+                 这样其它进程也可以使用缓存的结果。值必须可以序列化
+                 成 JSON 格式。
+    :param label: 在帮助页面上显示默认值 (查看 :class:`Option` 类的
+                  `show_default` 参数) 时，显示的是这个标签，而不会
+                  调用可调用对象来计算默认值。
+    """
+    if func is None:
+        return lambda f: _CachedDefault(f, ttl, path, label)
+    return _CachedDefault(func, ttl, path, label)
+
+
+def iter_line_chunks(file, chunk_size=1024 * 1024, encoding=None,
+                     errors='strict', keepends=False):
+    """按块读取一个文件或流数据中的所有行，每次生成一个行列表，列表
+    里是一块数据中的所有完整行。与逐行迭代一个文件相比，读取、分行和
+    解码都是针对整块数据一次完成的，这样处理很大的输入数据时，
+    命令可以一批一批地处理行，避免了每行的 Python 开销。 ::
+
+        @click.command()
+        @click.argument('input', type=click.File('rb'))
+        def cli(input):
+            for lines in click.iter_line_chunks(input, encoding='utf-8'):
+                process(lines)
+
+    行都是以 ``\n`` 来分隔的。文本流数据 (例如 :func:`get_text_stream`
+    返回的 ``'stdin'`` ) 已经由流数据自己解码并转换了换行符。二进制
+    流数据 (例如 :func:`get_binary_stream` 返回的流数据) 在给出了
+    `encoding` 时会用一个增量解码器一块一块地解码，没给出的话
+    生成的是字节串行。
+
+    .. versionadded:: 8.0
+
+    :param file: 为读取而打开的文件对象或流数据。
+    :param chunk_size: 每次读取的数据块大小，二进制流数据的单位是字节，
+                       文本流数据的单位是字符。
+    :param encoding: 解码二进制流数据时所用的编码。
+    :param errors: 解码时的错误处理模式。
+    :param keepends: 每行是否保留行尾的 ``\n`` 。
+    """
+    return _iter_split_chunks(file, '\n', chunk_size, encoding, errors,
+                              keepends)
+
+
 def get_os_args():
     """This returns the argument part of sys.argv in the most appropriate
     form for processing.  What this means is that this return value is in
@@ -409,6 +840,201 @@ def get_app_dir(app_name, roaming=True, force_posix=False):
         _posixify(app_name))
 
 
+_missing = object()
+#: marks the names of subcommand sections in the merged values.
+_subsection = object()
+
+#: parsed configuration files by path, together with the modification
+#: time and size of the file they were parsed from.
+_config_cache = {}
+
+
+def _get_toml_loads():
+    for name in ('tomllib', 'tomli', 'toml'):
+        try:
+            return __import__(name).loads
+        except ImportError:
+            pass
+    raise RuntimeError('Reading TOML configuration files requires Python '
+                       '3.11 or the tomli or toml package.')
+
+
+def _parse_ini(text, filename):
+    try:
+        from configparser import ConfigParser, Error
+    except ImportError:
+        from ConfigParser import ConfigParser, Error
+    parser = ConfigParser(interpolation=None) if not PY2 else ConfigParser()
+    try:
+        if PY2:
+            parser.readfp(io.BytesIO(text), filename)
+        else:
+            parser.read_string(text, filename)
+    except Error as e:
+        # Reported like the errors of the other formats.
+        raise ValueError(str(e))
+    rv = {}
+    # Dotted section names are the paths of subcommands.
+    for section in parser.sections():
+        node = rv
+        for part in section.split('.'):
+            node = node.setdefault(part, {})
+        node.update(parser.items(section, raw=True))
+    return rv
+
+
+def _load_config(filename):
+    """Parses a configuration file into nested dictionaries.  Files are
+    only parsed again if their modification time or size changed.
+    Returns `None` for files that do not exist.
+    """
+    from .exceptions import FileError
+    try:
+        st = os.stat(filename)
+    except OSError as e:
+        if e.errno == errno.ENOENT:
+            return None
+        raise FileError(filename, hint=get_streerror(e))
+    key = (st.st_mtime, st.st_size)
+    cached = _config_cache.get(filename)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    try:
+        # Directories and unreadable files are errors, unlike missing
+        # layers.
+        with open(filename, 'rb') as f:
+            text = f.read()
+    except (IOError, OSError) as e:
+        raise FileError(filename, hint=get_streerror(e))
+    try:
+        if not PY2 or not filename.endswith(('.ini', '.cfg', '.conf')):
+            text = text.decode('utf-8')
+        if filename.endswith('.json'):
+            import json
+            data = json.loads(text)
+        elif filename.endswith('.toml'):
+            data = _get_toml_loads()(text)
+        else:
+            data = _parse_ini(text, filename)
+    except ValueError as e:
+        # JSON, TOML and decoding errors are all value errors.
+        raise FileError(filename, hint='invalid configuration file: %s' % e)
+    if not isinstance(data, dict):
+        raise FileError(filename, hint='the configuration file does not '
+                        'contain a mapping')
+    _config_cache[filename] = (key, data)
+    return data
+
+
+class ConfigDefaultMap(object):
+    """一个从配置文件里读取参数形式默认值的 ``default_map`` 对象
+    (查看 :class:`Context` 类的 `default_map` 参数) 。 ::
+
+        @click.group(context_settings={
+            'default_map': click.ConfigDefaultMap.for_app('foo')})
+        def cli():
+            pass
+
+    配置文件是按层排列的，后面的文件覆写前面文件中的值，通常是系统层、
+    用户层和项目层。不存在的文件会被跳过。文件格式通过扩展名来决定:
+    ``.json`` 是 JSON 文件， ``.toml`` 是 TOML 文件 (需要 Python 3.11
+    或者安装 ``tomli`` 库) ，其它文件都是 INI 文件。
+
+    JSON 和 TOML 文件的内容对应着顶层命令，嵌套的表对应着子命令。
+    INI 文件里名字是 `section` 的段对应着顶层命令，子命令用句号分隔，
+    例如 ``[foo.sync]`` 。INI 文件里的值都是字符串。值的名字里的减号
+    会被转换成下划线，与参数形式的名字一致。无法读取或无法进行语法
+    分析的文件会抛出一个 :exc:`FileError` 例外，错误信息里有文件名。
+
+    文件直到第一次查找默认值的时候才会被读取，每个命令只会处理所需的
+    那些段。语法分析后的文件会缓存起来，只有文件的修改时间或大小变化了
+    才会再次进行语法分析。来自配置文件的值的来源是
+    :attr:`ParameterSource.CONFIG` 。
+
+    .. versionadded:: 8.0
+
+    :param paths: 配置文件路径组成的列表，优先级从低到高。
+    :param section: INI 文件里对应着顶层命令的段名。
+    """
+
+    #: 来自这个默认映射的值所报告的参数形式来源。
+    parameter_source = 'CONFIG'
+
+    def __init__(self, paths, section='main', _path=()):
+        self.paths = list(paths)
+        self.section = section
+        self._path = _path
+        self._values = None
+
+    @classmethod
+    def for_app(cls, app_name, filename='config.ini', project=True):
+        """为一个应用程序建立一个三层的默认映射:
+        在 POSIX 系统上是 ``/etc/<app_name>/<filename>`` ，
+        :func:`get_app_dir` 目录里的 `filename` 文件，以及
+        当前工作目录里的 ``.<app_name><扩展名>`` 项目文件。
+        INI 文件的段名是 `app_name` 。
+
+        :param app_name: 应用程序的名字。
+        :param filename: 系统层和用户层的配置文件名。
+        :param project: 是否读取当前工作目录里的项目配置文件。
+        """
+        paths = []
+        if not WIN:
+            paths.append(os.path.join('/etc', _posixify(app_name), filename))
+        paths.append(os.path.join(get_app_dir(app_name), filename))
+        if project:
+            paths.append(os.path.abspath('.%s%s' % (
+                _posixify(app_name), os.path.splitext(filename)[1])))
+        return cls(paths, section=app_name)
+
+    def _get_values(self):
+        # The sections of all layers for this command path, merged with
+        # the later layers winning.
+        if self._values is not None:
+            return self._values
+        values = {}
+        for filename in self.paths:
+            node = _load_config(filename)
+            if node is None:
+                continue
+            if not filename.endswith(('.json', '.toml')):
+                node = node.get(self.section)
+            for part in self._path:
+                if not isinstance(node, dict):
+                    break
+                node = node.get(part)
+            if not isinstance(node, dict):
+                continue
+            for key, value in iteritems(node):
+                if isinstance(value, dict):
+                    values[key] = _subsection
+                else:
+                    values[key.replace('-', '_')] = value
+        self._values = values
+        return values
+
+    def get(self, key, default=None):
+        rv = self._get_values().get(key, default)
+        if rv is _subsection:
+            return ConfigDefaultMap(self.paths, self.section,
+                                    self._path + (key,))
+        return rv
+
+    def __getitem__(self, key):
+        rv = self.get(key, _missing)
+        if rv is _missing:
+            raise KeyError(key)
+        return rv
+
+    def __contains__(self, key):
+        return key in self._get_values()
+
+    def __repr__(self):
+        return '<ConfigDefaultMap %s>' % '.'.join(
+            (self.section,) + self._path)
+
+
 class PacifyFlushWrapper(object):
     """This wrapper is used to catch and suppress BrokenPipeErrors resulting
     from ``.flush()`` being called on broken pipe during the shutdown/final-GC
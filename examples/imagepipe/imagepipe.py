@@ -1,5 +1,4 @@
 import click
-from functools import update_wrapper
 from PIL import Image, ImageFilter, ImageEnhance
 
 
@@ -17,48 +16,18 @@ def cli():
 
 
 @cli.resultcallback()
-def process_commands(processors):
+def process_commands(stages):
     """This result callback is invoked with an iterable of all the chained
-    subcommands.  As in this example each subcommand returns a function
-    we can chain them together to feed one into the other, similar to how
-    a pipe on unix works.
+    subcommands.  As in this example each subcommand returns a pipeline
+    stage we can chain them together to feed one into the other, similar
+    to how a pipe on unix works.
     """
-    # Start with an empty iterable.
-    stream = ()
-
-    # Pipe it through all stream processors.
-    for processor in processors:
-        stream = processor(stream)
-
-    # Evaluate the stream and throw away the items.
-    for _ in stream:
+    # Images are large, pass them through the stages one at a time and
+    # throw away the items.
+    for _ in click.run_pipeline(stages, batch_size=1):
         pass
 
 
-def processor(f):
-    """Helper decorator to rewrite a function so that it returns another
-    function from it.
-    """
-    def new_func(*args, **kwargs):
-        def processor(stream):
-            return f(stream, *args, **kwargs)
-        return processor
-    return update_wrapper(new_func, f)
-
-
-def generator(f):
-    """Similar to the :func:`processor` but passes through old values
-    unchanged and does not pass through the values as parameter.
-    """
-    @processor
-    def new_func(stream, *args, **kwargs):
-        for item in stream:
-            yield item
-        for item in f(*args, **kwargs):
-            yield item
-    return update_wrapper(new_func, f)
-
-
 def copy_filename(new, old):
     new.filename = old.filename
     return new
@@ -67,7 +36,7 @@ def copy_filename(new, old):
 @cli.command('open')
 @click.option('-i', '--image', 'images', type=click.Path(),
               multiple=True, help='The image file to open.')
-@generator
+@click.generator
 def open_cmd(images):
     """Loads one or multiple images for processing.  The input parameter
     can be specified multiple times to load more than one image.
@@ -89,7 +58,7 @@ def open_cmd(images):
 @click.option('--filename', default='processed-%04d.png', type=click.Path(),
               help='The format for the filename.',
               show_default=True)
-@processor
+@click.processor
 def save_cmd(images, filename):
     """Saves all processed images to a series of files."""
     for idx, image in enumerate(images):
@@ -103,7 +72,7 @@ def save_cmd(images, filename):
 
 
 @cli.command('display')
-@processor
+@click.processor
 def display_cmd(images):
     """Opens all images in an image viewer."""
     for image in images:
@@ -115,7 +84,7 @@ def display_cmd(images):
 @cli.command('resize')
 @click.option('-w', '--width', type=int, help='The new width of the image.')
 @click.option('-h', '--height', type=int, help='The new height of the image.')
-@processor
+@click.processor
 def resize_cmd(images, width, height):
     """Resizes an image by fitting it into the box without changing
     the aspect ratio.
@@ -130,7 +99,7 @@ def resize_cmd(images, width, height):
 @cli.command('crop')
 @click.option('-b', '--border', type=int, help='Crop the image from all '
               'sides by this amount.')
-@processor
+@click.processor
 def crop_cmd(images, border):
     """Crops an image from all edges."""
     for image in images:
@@ -174,7 +143,7 @@ def convert_flip(ctx, param, value):
               help='Rotates the image (in degrees)')
 @click.option('-f', '--flip', callback=convert_flip,
               help='Flips the image  [LR / TB]')
-@processor
+@click.processor
 def transpose_cmd(images, rotate, flip):
     """Transposes an image by either rotating or flipping it."""
     for image in images:
@@ -192,7 +161,7 @@ def transpose_cmd(images, rotate, flip):
 @cli.command('blur')
 @click.option('-r', '--radius', default=2, show_default=True,
               help='The blur radius.')
-@processor
+@click.processor
 def blur_cmd(images, radius):
     """Applies gaussian blur."""
     blur = ImageFilter.GaussianBlur(radius)
@@ -204,7 +173,7 @@ def blur_cmd(images, radius):
 @cli.command('smoothen')
 @click.option('-i', '--iterations', default=1, show_default=True,
               help='How many iterations of the smoothen filter to run.')
-@processor
+@click.processor
 def smoothen_cmd(images, iterations):
     """Applies a smoothening filter."""
     for image in images:
@@ -216,7 +185,7 @@ def smoothen_cmd(images, iterations):
 
 
 @cli.command('emboss')
-@processor
+@click.processor
 def emboss_cmd(images):
     """Embosses an image."""
     for image in images:
@@ -227,7 +196,7 @@ def emboss_cmd(images):
 @cli.command('sharpen')
 @click.option('-f', '--factor', default=2.0,
               help='Sharpens the image.', show_default=True)
-@processor
+@click.processor
 def sharpen_cmd(images, factor):
     """Sharpens an image."""
     for image in images:
@@ -239,7 +208,7 @@ def sharpen_cmd(images, factor):
 @cli.command('paste')
 @click.option('-l', '--left', default=0, help='Offset from left.')
 @click.option('-r', '--right', default=0, help='Offset from right.')
-@processor
+@click.processor
 def paste_cmd(images, left, right):
     """Pastes the second image on the first image and leaves the rest
     unchanged.
@@ -1,3 +1,5 @@
+import sys
+
 from click.testing import CliRunner
 
 import pytest
@@ -6,3 +8,9 @@ import pytest
 @pytest.fixture(scope='function')
 def runner(request):
     return CliRunner()
+
+
+# The async tests use syntax that older interpreters cannot compile.
+collect_ignore = []
+if sys.version_info < (3, 5):
+    collect_ignore.append('test_async.py')
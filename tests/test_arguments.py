@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import pytest
 import click
 from click._compat import PY2
@@ -69,6 +70,47 @@ def test_nargs_tup_composite(runner):
         ]
 
 
+def test_nargs_star_numeric(runner):
+    @click.command()
+    @click.argument('ids', nargs=-1, type=click.IntRange(0, 100000))
+    def cli(ids):
+        assert isinstance(ids, tuple)
+        click.echo('%d %d' % (len(ids), sum(ids)))
+
+    args = [str(x) for x in range(10000)]
+    result = runner.invoke(cli, args)
+    assert not result.exception
+    assert result.output == '10000 49995000\n'
+
+    result = runner.invoke(cli, ['--', '1', '2', 'x', '-5'])
+    assert result.exit_code == 2
+    assert 'x is not a valid integer' in result.output
+
+    result = runner.invoke(cli, ['--', '1', '200000', '-5'])
+    assert result.exit_code == 2
+    assert '200000 is not in the valid range of 0 to 100000.' \
+        in result.output
+
+
+def test_nargs_star_as_array(runner):
+    numpy = pytest.importorskip('numpy')
+
+    @click.command()
+    @click.argument('values', nargs=-1, as_array=True,
+                    type=click.FloatRange(0, 1, clamp=True))
+    def cli(values):
+        assert isinstance(values, numpy.ndarray)
+        click.echo(repr(values.tolist()))
+
+    result = runner.invoke(cli, ['--', '0.5', '-1', '2'])
+    assert not result.exception
+    assert result.output == '[0.5, 0.0, 1.0]\n'
+
+    result = runner.invoke(cli, ['0.5', 'nope'])
+    assert result.exit_code == 2
+    assert 'nope is not a valid floating point value' in result.output
+
+
 def test_nargs_err(runner):
     @click.command()
     @click.argument('x')
@@ -139,6 +181,45 @@ def test_file_atomics(runner):
             assert f.read() == b'Foo bar baz\n'
 
 
+def test_file_atomics_fsync(runner, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, 'fsync',
+                        lambda fd: synced.append(fd) or real_fsync(fd))
+
+    @click.command()
+    @click.argument('outputs', nargs=-1, type=click.File(
+        'w', atomic=True, lazy=False, fsync='batch', buffering=1 << 20))
+    @click.option('--log', type=click.File('w', atomic=True, fsync=True))
+    def cli(outputs, log):
+        for output in outputs:
+            output.write(u'new\n')
+            output.close()
+            with open(output.name) as f:
+                assert f.read() == 'old\n'
+        assert synced == []
+        log.write(u'done\n')
+        log.close()
+        assert len(synced) == 2
+
+    with runner.isolated_filesystem():
+        names = ['%d.txt' % x for x in range(3)]
+        for name in names:
+            with open(name, 'w') as f:
+                f.write('old\n')
+        result = runner.invoke(cli, ['--log', 'log.txt'] + names)
+        assert not result.exception
+        assert len(synced) == 2 + len(names) + 1
+        for name in names:
+            with open(name) as f:
+                assert f.read() == 'new\n'
+        with open('log.txt') as f:
+            assert f.read() == 'done\n'
+
+    with pytest.raises(ValueError):
+        click.File('w', fsync=True)
+
+
 def test_stdout_default(runner):
     @click.command()
     @click.argument('output', type=click.File('w'), default='-')
@@ -296,3 +377,75 @@ def test_multiple_param_decls_not_allowed(runner):
         @click.argument('x', click.Choice(['a', 'b']))
         def copy(x):
             click.echo(x)
+
+
+def test_response_files(runner):
+    @click.group(context_settings={'response_files': True})
+    def cli():
+        pass
+
+    @cli.command()
+    @click.option('--sep', default=',')
+    @click.argument('paths', nargs=-1)
+    def join(sep, paths):
+        click.echo(sep.join(paths))
+
+    with runner.isolated_filesystem():
+        with open('args.txt', 'wb') as f:
+            f.write(b'--sep\r\n:\r\n@not-expanded\r\n')
+        with open('paths.txt', 'wb') as f:
+            f.write(b'\n'.join(str(x).encode('ascii') for x in range(1000)))
+
+        result = runner.invoke(cli, ['join', '@args.txt', 'a', '@paths.txt',
+                                     '@'])
+        assert not result.exception
+        assert result.output == ':'.join(
+            ['@not-expanded', 'a'] + [str(x) for x in range(1000)] +
+            ['@']) + '\n'
+
+        result = runner.invoke(cli, ['join', '@-', 'b'], input='x y\0z\0')
+        assert result.output == 'x y\0z\0,b\n'
+
+        result = runner.invoke(cli, ['join', '@missing.txt'])
+        assert result.exit_code == 1
+        assert 'missing.txt' in result.output
+
+        result = runner.invoke(cli, ['join', '@-'], input='x y\0z\0',
+                               response_files='nul')
+        assert result.output == 'x y,z\n'
+
+
+def test_nargs_star_lazy(runner):
+    converted = []
+
+    class Tracked(click.ParamType):
+        name = 'tracked'
+
+        def convert(self, value, param, ctx):
+            converted.append(value)
+            if value == 'bad':
+                self.fail('%s is bad' % value, param, ctx)
+            return int(value)
+
+    @click.command()
+    @click.argument('values', nargs=-1, type=Tracked(), lazy=True)
+    def cli(values):
+        assert converted == []
+        assert len(values) == 3
+        for value in values:
+            click.echo(value)
+            assert converted[-1] == str(value)
+        assert list(values) == []
+
+    result = runner.invoke(cli, ['1', '2', '3'])
+    assert not result.exception
+    assert result.output == '1\n2\n3\n'
+
+    del converted[:]
+    result = runner.invoke(cli, ['1', 'bad', '3'])
+    assert result.exit_code == 2
+    assert result.output.startswith('1\n')
+    assert 'Invalid value for "[VALUES]...": bad is bad' in result.output
+
+    with pytest.raises(TypeError):
+        click.Argument(['x'], lazy=True)
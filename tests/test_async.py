@@ -0,0 +1,168 @@
+import asyncio
+
+import click
+
+
+def test_async_callback(runner):
+    @click.command()
+    @click.argument('value', type=int)
+    async def cli(value):
+        await asyncio.sleep(0)
+        return value * 2
+
+    assert cli.main(['21'], standalone_mode=False) == 42
+
+
+def test_async_chain_one_loop(runner):
+    loops = []
+    closed = []
+
+    @click.group(chain=True)
+    @click.pass_context
+    async def cli(ctx):
+        loops.append(asyncio.get_event_loop())
+
+        async def cleanup():
+            await asyncio.sleep(0)
+            closed.append(asyncio.get_event_loop())
+        ctx.call_on_close(cleanup)
+
+    @cli.command()
+    async def a():
+        loops.append(asyncio.get_event_loop())
+        return 'a'
+
+    @cli.command()
+    def b():
+        return 'b'
+
+    @cli.resultcallback()
+    async def process(results):
+        loops.append(asyncio.get_event_loop())
+        click.echo(' '.join(results))
+
+    result = runner.invoke(cli, ['a', 'b', 'a'])
+    assert not result.exception
+    assert result.output == 'a b a\n'
+    assert len(loops) == 4 and len(set(loops)) == 1
+    assert closed == loops[:1]
+    assert loops[0].is_closed()
+
+
+def test_await_context_invoke(runner):
+    @click.command()
+    @click.argument('name')
+    async def greet(name):
+        await asyncio.sleep(0)
+        assert click.get_current_context().command is greet
+        return 'Hello %s!' % name
+
+    @click.command()
+    @click.pass_context
+    async def cli(ctx):
+        click.echo(await ctx.invoke(greet, name='World'))
+
+    result = runner.invoke(cli)
+    assert not result.exception
+    assert result.output == 'Hello World!\n'
+
+
+def test_await_context_invoke_resources(runner, tmpdir):
+    path = tmpdir.join('data.txt')
+    path.write('data')
+    closed = []
+
+    @click.command()
+    @click.option('--src', type=click.File('r'), default=str(path))
+    @click.pass_context
+    async def reader(ctx, src):
+        async def close():
+            await asyncio.sleep(0)
+            closed.append(src.name)
+
+        ctx.call_on_close(close)
+        await asyncio.sleep(0)
+        return src.read()
+
+    @click.command()
+    @click.pass_context
+    async def cli(ctx):
+        click.echo(await ctx.invoke(reader))
+        click.echo(closed)
+
+    result = runner.invoke(cli)
+    assert not result.exception
+    assert result.output == 'data\n%r\n' % [str(path)]
+
+
+def test_main_async(runner):
+    async def main():
+        loop = asyncio.get_event_loop()
+
+        @click.command()
+        @click.option('--count', type=int)
+        async def cli(count):
+            assert asyncio.get_event_loop() is loop
+            assert click.get_current_context().params == {'count': count}
+            await asyncio.sleep(0)
+            return count
+
+        results = await asyncio.gather(
+            cli.main_async(['--count', '1'], standalone_mode=False),
+            cli.main_async(['--count', '2'], standalone_mode=False))
+        assert results == [1, 2]
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+
+def test_async_chain_concurrency(runner):
+    loops = []
+
+    @click.group(chain=True, concurrency=2)
+    async def cli():
+        loops.append(asyncio.get_event_loop())
+
+    @cli.command()
+    @click.argument('name')
+    async def job(name):
+        loops.append(asyncio.get_event_loop())
+        await asyncio.sleep(0.01)
+        return name
+
+    @cli.resultcallback()
+    async def process(results):
+        loops.append(asyncio.get_event_loop())
+        click.echo(' '.join(results))
+
+    result = runner.invoke(cli, ['job', 'a', 'job', 'b', 'job', 'c'])
+    assert not result.exception
+    assert result.output == 'a b c\n'
+    assert len(loops) == 5 and len(set(loops)) == 1
+    assert loops[0].is_closed()
+
+
+def test_invoke_from_foreign_loop(runner):
+    @click.command()
+    async def inner():
+        await asyncio.sleep(0)
+        return 42
+
+    @click.command()
+    @click.pass_context
+    def cli(ctx):
+        async def main():
+            return await ctx.invoke(inner)
+
+        loop = asyncio.new_event_loop()
+        try:
+            click.echo(loop.run_until_complete(main()))
+        finally:
+            loop.close()
+
+    result = runner.invoke(cli)
+    assert not result.exception
+    assert result.output == '42\n'
@@ -2,6 +2,8 @@
 import os
 import uuid
 import click
+import pytest
+from click._compat import PY2
 
 
 def test_basic_functionality(runner):
@@ -331,6 +333,223 @@ def test_path_option(runner):
         assert 'exists=True' in result.output
 
 
+def test_array_option(runner):
+    numpy = pytest.importorskip('numpy')
+
+    @click.command()
+    @click.option('-a', type=click.Array())
+    @click.option('-r', type=click.Array(format='raw', dtype='int32',
+                                         shape=(2, 2)))
+    def cli(a, r):
+        if a is not None:
+            click.echo('%s %r' % (a.shape, a.tolist()))
+        if r is not None:
+            click.echo('%s %s' % (isinstance(r, numpy.memmap), r.tolist()))
+
+    with runner.isolated_filesystem():
+        numpy.save('data.npy', numpy.arange(4.0))
+        with open('data.txt', 'w') as f:
+            f.write('# x y\n1 2\n3 4\n\n5 6\n')
+        numpy.arange(4, dtype='int32').tofile('data.bin')
+
+        result = runner.invoke(cli, ['-a', 'data.npy', '-r', 'data.bin'])
+        assert not result.exception
+        assert result.output == \
+            '(4,) [0.0, 1.0, 2.0, 3.0]\nTrue [[0, 1], [2, 3]]\n'
+
+        result = runner.invoke(cli, ['-a', 'data.txt'])
+        assert not result.exception
+        assert result.output == \
+            '(3, 2) [[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]\n'
+
+        result = runner.invoke(cli, ['-a', '-'], input='1\n2\n3\n')
+        assert not result.exception
+        assert result.output == '(3,) [1.0, 2.0, 3.0]\n'
+
+        result = runner.invoke(cli, ['-a', 'missing.txt'])
+        assert result.exit_code == 2
+        assert 'Could not open file: missing.txt' in result.output
+
+        with open('bad.txt', 'w') as f:
+            f.write('1 2\nx y\n')
+        result = runner.invoke(cli, ['-a', 'bad.txt'])
+        assert result.exit_code == 2
+        assert 'Could not read array from bad.txt' in result.output
+
+
+def test_file_mmap_option(runner):
+    @click.command()
+    @click.option('--input', type=click.File('rb', mmap=True))
+    def cli(input):
+        click.echo(type(input).__name__)
+        click.echo(input.read(5))
+        click.echo(input.read())
+
+    with runner.isolated_filesystem():
+        with open('data.bin', 'wb') as f:
+            f.write(b'hello world')
+        open('empty.bin', 'wb').close()
+
+        result = runner.invoke(cli, ['--input', 'data.bin'])
+        assert not result.exception
+        assert result.output == 'mmap\nhello\n world\n'
+
+        result = runner.invoke(cli, ['--input', '-'], input='hello stdin')
+        assert not result.exception
+        assert result.output.splitlines()[1:] == ['hello', ' stdin']
+
+        result = runner.invoke(cli, ['--input', 'empty.bin'])
+        assert not result.exception
+        assert result.output.splitlines()[1:] == ['', '']
+
+        result = runner.invoke(cli, ['--input', 'missing.bin'])
+        assert result.exit_code == 2
+        assert 'Could not open file: missing.bin' in result.output
+
+    with pytest.raises(ValueError):
+        click.File('r', mmap=True)
+
+
+def test_file_compression_option(runner):
+    import io
+    import gzip
+
+    @click.command()
+    @click.argument('input', type=click.File('rb', compression='auto'))
+    @click.argument('output', type=click.File('wb', compression='auto',
+                                              lazy=True))
+    def cli(input, output):
+        output.write(input.read().upper())
+
+    with runner.isolated_filesystem():
+        with gzip.open('in.gz', 'wb') as f:
+            f.write(b'hello')
+
+        result = runner.invoke(cli, ['in.gz', 'out.gz'])
+        assert not result.exception
+        with gzip.open('out.gz', 'rb') as f:
+            assert f.read() == b'HELLO'
+
+        buf = io.BytesIO()
+        with gzip.GzipFile(fileobj=buf, mode='wb') as f:
+            f.write(b'stdin')
+        result = runner.invoke(cli, ['-', 'out.txt'], input=buf.getvalue())
+        assert not result.exception
+        with open('out.txt', 'rb') as f:
+            assert f.read() == b'STDIN'
+
+        result = runner.invoke(cli, ['-', '-'], input=b'plain')
+        assert not result.exception
+        assert result.output == 'PLAIN'
+
+
+def test_file_prefetch_option(runner):
+    @click.command()
+    @click.argument('inputs', nargs=-1, type=click.File(
+        'r', prefetch=2, buffering=16))
+    @click.option('--lazy', type=click.File('rb', lazy=True, prefetch=1))
+    def cli(inputs, lazy):
+        for f in inputs:
+            click.echo(''.join(line.upper() for line in f), nl=False)
+        if lazy is not None:
+            click.echo(lazy.read(3))
+
+    with runner.isolated_filesystem():
+        for x in range(3):
+            with open('%d.txt' % x, 'w') as f:
+                f.write('line %d\n' % x * 10)
+
+        result = runner.invoke(cli, ['--lazy', '0.txt', '0.txt', '2.txt'])
+        assert not result.exception
+        assert result.output == ('LINE 0\n' * 10 + 'LINE 2\n' * 10 +
+                                 'lin\n')
+
+        result = runner.invoke(cli, ['-'], input='stdin\n')
+        assert not result.exception
+        assert result.output == 'STDIN\n'
+
+    with pytest.raises(ValueError):
+        click.File('w', prefetch=1)
+
+
+def test_path_many_values(runner):
+    @click.command()
+    @click.argument('paths', nargs=-1, type=click.Path(exists=True,
+                                                       dir_okay=False))
+    def cli(paths):
+        click.echo(len(paths))
+
+    with runner.isolated_filesystem():
+        os.mkdir('d')
+        names = []
+        for x in range(100):
+            name = 'f%d.txt' % x
+            with open(name, 'w') as f:
+                f.write('x')
+            names.append(name)
+
+        result = runner.invoke(cli, names + names)
+        assert not result.exception
+        assert result.output == '200\n'
+
+        result = runner.invoke(cli, names + ['missing', 'd', 'missing'])
+        assert result.exit_code == 2
+        assert 'File "missing" does not exist.\n' \
+            'File "d" is a directory.' in result.output
+        assert result.output.count('missing') == 1
+
+
+@pytest.mark.skipif(PY2, reason='concurrent.futures needs Python 3')
+def test_path_many_values_without_threads(runner, monkeypatch, tmpdir):
+    import concurrent.futures
+
+    def no_threads(*args, **kwargs):
+        raise RuntimeError("can't start new thread")
+
+    monkeypatch.setattr(concurrent.futures, 'ThreadPoolExecutor', no_threads)
+    names = []
+    for x in range(100):
+        path = tmpdir.join('f%d.txt' % x)
+        path.write('x')
+        names.append(str(path))
+
+    ty = click.Path(exists=True)
+    assert ty.convert_many(names) == tuple(names)
+    with pytest.raises(click.BadParameter):
+        ty.convert_many(names + [str(tmpdir.join('missing'))])
+
+
+def test_path_stat_cache(monkeypatch):
+    calls = []
+    real_stat = os.stat
+
+    def stat(path):
+        calls.append(path)
+        return real_stat(path)
+
+    monkeypatch.setattr(os, 'stat', stat)
+    ty = click.Path(exists=True, allow_dash=True)
+    ctx = click.Context(click.Command('cli'))
+    assert ty.convert_many(['.', '-', '.'], None, ctx) == ('.', '-', '.')
+    assert ty.convert('.', None, ctx) == '.'
+    assert calls == ['.']
+
+
+def test_path_subclass_many(runner, tmpdir):
+    class HomePath(click.Path):
+        def convert(self, value, param, ctx):
+            value = value.replace('~', str(tmpdir))
+            return click.Path.convert(self, value, param, ctx)
+
+    @click.command()
+    @click.argument('paths', nargs=-1, type=HomePath(exists=True))
+    def cli(paths):
+        assert paths == (str(tmpdir), str(tmpdir))
+
+    result = runner.invoke(cli, ['~', '~'])
+    assert not result.exception
+
+
 def test_choice_option(runner):
     @click.command()
     @click.option('--method', type=click.Choice(['foo', 'bar', 'baz']))
@@ -388,6 +607,46 @@ def test_datetime_option_custom(runner):
     assert result.output == '2010-06-05T00:00:00\n'
 
 
+def test_datetime_many_values(runner):
+    @click.command()
+    @click.option('--at', multiple=True, type=click.DateTime())
+    def cli(at):
+        click.echo(len(at))
+        click.echo(at[0].isoformat())
+        click.echo(at[-1].isoformat())
+
+    args = []
+    for x in range(1, 29):
+        args.extend(['--at', '2015-02-%02d' % x])
+        args.extend(['--at', '2015-02-%02d 12:30:00' % x])
+        args.extend(['--at', '2015-02-%02dT12:30:00' % x])
+    result = runner.invoke(cli, args)
+    assert not result.exception
+    assert result.output == '84\n2015-02-01T00:00:00\n2015-02-28T12:30:00\n'
+
+    # Unpadded fields are not canonical ISO but strptime accepts them.
+    result = runner.invoke(cli, ['--at', '2015-2-1',
+                                 '--at', '2015-02-01 1:02:03'])
+    assert not result.exception
+    assert result.output == '2\n2015-02-01T00:00:00\n2015-02-01T01:02:03\n'
+
+    result = runner.invoke(cli, ['--at', '2015-02-30'])
+    assert result.exit_code == 2
+    assert 'invalid datetime format: 2015-02-30.' in result.output
+
+
+def test_datetime_format_order():
+    dt = click.DateTime(formats=['%Y-%d-%m', '%Y-%m-%d'])
+    for x in range(5):
+        assert dt.convert('2015-09-10', None, None).month == 10
+
+    dt = click.DateTime()
+    for x in range(5):
+        assert dt.convert('2015-09-10 01:02:03', None, None).second == 3
+    assert dt.convert('2015-09-10', None, None).day == 10
+    assert dt._format_order[0] == '%Y-%m-%d %H:%M:%S'
+
+
 def test_int_range_option(runner):
     @click.command()
     @click.option('--x', type=click.IntRange(0, 5))
@@ -552,3 +811,24 @@ def test_hidden_group(runner):
     assert result.exit_code == 0
     assert 'subgroup' not in result.output
     assert 'nope' not in result.output
+
+
+def test_compact_params():
+    class ExtendedOption(click.Option):
+        __slots__ = ('extra',)
+
+    params = [click.Option(['--opt-%d' % x], default=x, help='help')
+              for x in range(100)]
+    params.append(click.Argument(['files'], nargs=-1, lazy=True))
+    # Everything the classes set is stored in slots.
+    assert all(vars(param) == {} for param in params)
+
+    param = ExtendedOption(['--extra'])
+    param.extra = 1
+    param.anything = 2
+    assert vars(param) == {'anything': 2}
+
+    ctx = click.Context(click.Command('cmd', params=params))
+    assert vars(ctx) == {}
+    ctx.custom = 1
+    assert vars(ctx) == {'custom': 1}
@@ -1,4 +1,5 @@
 import sys
+import threading
 import click
 import pytest
 
@@ -250,3 +251,136 @@ def test_multicommand_chaining(runner):
         'l2a=',
         'l1b=',
     ]
+
+
+def test_chain_concurrency(runner):
+    started = []
+    all_started = threading.Event()
+
+    @click.group(chain=True, concurrency=3)
+    def cli():
+        pass
+
+    @cli.resultcallback()
+    def process(results):
+        click.echo(' '.join(results))
+
+    @cli.command()
+    @click.argument('name')
+    def job(name):
+        started.append(name)
+        if len(started) == 3:
+            all_started.set()
+        # Only returns if the three jobs run at the same time.
+        assert all_started.wait(5)
+        return name
+
+    result = runner.invoke(cli, ['job', 'a', 'job', 'b', 'job', 'c'])
+    assert not result.exception
+    assert result.output == 'a b c\n'
+
+
+def test_chain_concurrency_failure(runner):
+    closed = []
+
+    def track(ctx, param, value):
+        ctx.call_on_close(lambda: closed.append(value))
+        return value
+
+    @click.group(chain=True, concurrency=2)
+    def cli():
+        pass
+
+    @cli.command()
+    @click.argument('name', callback=track)
+    def job(name):
+        if name == 'bad':
+            raise RuntimeError(name)
+
+    result = runner.invoke(cli, ['job', 'bad', 'job', 'a', 'job', 'b',
+                                 'job', 'c'])
+    assert isinstance(result.exception, RuntimeError)
+    assert sorted(closed) == ['a', 'b', 'bad', 'c']
+
+    with pytest.raises(TypeError):
+        click.Group(concurrency=2)
+
+
+def make_pipeline_cli(workers=None, ordered=True):
+    @click.group(chain=True, invoke_without_command=True)
+    @click.option('--batch-size', default=2)
+    def cli(batch_size):
+        pass
+
+    @cli.resultcallback()
+    def process(stages, batch_size):
+        items = click.run_pipeline(stages, batch_size=batch_size)
+        click.echo(' '.join(items))
+
+    @cli.command('range')
+    @click.argument('count', type=int)
+    @click.generator
+    def range_cmd(count):
+        return (str(x) for x in range(count))
+
+    @cli.command()
+    @click.option('--by', default=2)
+    @click.mapper(workers=workers, ordered=ordered, queue_size=2)
+    def scale(item, by):
+        assert click.get_current_context().info_name == 'cli'
+        return str(int(item) * by)
+
+    return cli
+
+
+@pytest.mark.parametrize('workers, ordered', [
+    (None, True), (3, True), (3, False),
+])
+def test_pipeline_mapper(runner, workers, ordered):
+    cli = make_pipeline_cli(workers, ordered)
+    result = runner.invoke(cli, ['range', '7', 'scale', '--by', '3'])
+    assert not result.exception
+    items = result.output.split()
+    if not ordered:
+        items.sort(key=int)
+    assert items == ['0', '3', '6', '9', '12', '15', '18']
+
+
+def test_pipeline_stages(runner):
+    cli = make_pipeline_cli()
+
+    @cli.command()
+    @click.processor(batched=True)
+    def pairs(batches):
+        for batch in batches:
+            assert len(batch) <= 2
+            yield ['+'.join(batch)]
+
+    @cli.command()
+    @click.processor
+    def skip_first(items):
+        next(items, None)
+        for item in items:
+            yield item
+
+    @cli.command()
+    def noop():
+        pass
+
+    result = runner.invoke(cli, ['range', '7', 'scale', '--by', '3', 'noop',
+                                 'skip-first', 'range', '2', 'pairs'])
+    assert not result.exception
+    assert result.output == '3+6 9+12 15+18 0+1\n'
+
+
+def test_pipeline_mapper_error():
+    @click.mapper(workers=2)
+    def fail(item):
+        if item == 3:
+            raise ValueError(item)
+        return item
+
+    with pytest.raises(ValueError):
+        list(click.run_pipeline([fail()], items=range(10), batch_size=1))
+    with pytest.raises(TypeError):
+        list(click.run_pipeline([42]))
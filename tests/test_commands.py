@@ -291,3 +291,99 @@ def test_deprecated_in_invocation(runner):
 
     result = runner.invoke(deprecated_cmd)
     assert 'DeprecationWarning:' in result.output
+
+
+def test_group_sorted_names_cache():
+    group = click.Group()
+    for name in ['b', 'c', 'a']:
+        group.add_command(click.Command(name))
+    assert group.list_commands(None) == ['a', 'b', 'c']
+    group.list_commands(None).append('z')
+    assert group.list_commands(None) == ['a', 'b', 'c']
+
+    del group.commands['b']
+    group.commands.update(d=click.Command('d'))
+    assert group.list_commands(None) == ['a', 'c', 'd']
+
+
+def test_group_commands_dict_is_aliased(runner):
+    commands = {'a': click.Command('a', callback=lambda: click.echo('a'))}
+    group = click.Group(commands=commands)
+    assert group.commands is commands
+    commands['b'] = click.Command('b', callback=lambda: click.echo('b'))
+    assert group.list_commands(None) == ['a', 'b']
+    assert runner.invoke(group, ['b']).output == 'b\n'
+
+    cli = click.CommandCollection(sources=[group])
+    commands['c'] = click.Command('c')
+    assert cli.list_commands(None) == ['a', 'b', 'c']
+
+
+def test_command_collection_index(runner):
+    first = click.Group()
+    second = click.Group()
+
+    @first.command()
+    def shared():
+        click.echo('first')
+
+    @second.command('shared')
+    def shared2():
+        click.echo('second')
+
+    @second.command()
+    def only():
+        click.echo('only')
+
+    cli = click.CommandCollection(sources=[first, second])
+    assert cli.list_commands(None) == ['only', 'shared']
+    assert runner.invoke(cli, ['shared']).output == 'first\n'
+    assert runner.invoke(cli, ['only']).output == 'only\n'
+
+    @second.command()
+    def late():
+        click.echo('late')
+
+    del first.commands['shared']
+    assert cli.list_commands(None) == ['late', 'only', 'shared']
+    assert runner.invoke(cli, ['shared']).output == 'second\n'
+
+    class Dynamic(click.MultiCommand):
+        def list_commands(self, ctx):
+            return []
+
+        def get_command(self, ctx, name):
+            if name == 'dynamic':
+                return click.Command(name, callback=lambda: click.echo(name))
+
+    cli.sources.insert(0, Dynamic())
+    assert runner.invoke(cli, ['dynamic']).output == 'dynamic\n'
+    assert runner.invoke(cli, ['only']).output == 'only\n'
+
+
+def test_abbreviated_commands(runner):
+    @click.group(context_settings={'allow_abbreviations': True})
+    def cli():
+        pass
+
+    for name in ['status', 'stash', 'push', 'pu']:
+        cli.add_command(click.Command(
+            name, callback=lambda name=name: click.echo(name)))
+
+    assert runner.invoke(cli, ['stat']).output == 'status\n'
+    assert runner.invoke(cli, ['pus']).output == 'push\n'
+    # A full name wins over the commands it is a prefix of.
+    assert runner.invoke(cli, ['pu']).output == 'pu\n'
+
+    result = runner.invoke(cli, ['st'])
+    assert result.exit_code == 2
+    assert 'Ambiguous command "st", could be: stash, status.' \
+        in result.output
+
+    # The cached names are updated when commands are added.
+    cli.add_command(click.Command('stage', callback=lambda: None))
+    assert 'could be: stage, stash, status.' \
+        in runner.invoke(cli, ['sta']).output
+
+    plain = click.Group(commands=cli.commands)
+    assert 'No such command "stat"' in runner.invoke(plain, ['stat']).output
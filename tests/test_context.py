@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+import os
 import click
 import pytest
 
@@ -315,3 +316,76 @@ def test_parameter_source_environment_variable_specified(runner):
 def test_validate_parameter_source():
     with pytest.raises(ValueError):
         click.ParameterSource.validate("NOT_A_VALID_PARAMETER_SOURCE")
+
+
+def test_config_default_map(runner, tmpdir):
+    system = tmpdir.join('system.ini')
+    system.write('[main]\nname = system\n\n'
+                 '[main.sync]\nretries = 1\ndry-run = yes\n')
+    user = tmpdir.join('user.json')
+    user.write('{"sync": {"retries": 3}}')
+    missing = tmpdir.join('missing.ini')
+    default_map = click.ConfigDefaultMap(
+        [str(system), str(user), str(missing)])
+
+    @click.group(context_settings={'default_map': default_map})
+    @click.option('--name')
+    @click.pass_context
+    def cli(ctx, name):
+        click.echo('name=%s %s' % (name, ctx.get_parameter_source('name')))
+
+    @cli.command()
+    @click.option('--retries', type=int, default=0)
+    @click.option('--dry-run', is_flag=True)
+    @click.option('--verbose', is_flag=True)
+    @click.pass_context
+    def sync(ctx, retries, dry_run, verbose):
+        click.echo('retries=%d dry_run=%s %s %s' % (
+            retries, dry_run, ctx.get_parameter_source('retries'),
+            ctx.get_parameter_source('verbose')))
+
+    result = runner.invoke(cli, ['sync'])
+    assert not result.exception
+    assert result.output == ('name=system CONFIG\n'
+                             'retries=3 dry_run=True CONFIG DEFAULT\n')
+
+    # Changed files are parsed again.
+    user.write('{"sync": {"retries": 5, "dry_run": false}}')
+    os.utime(str(user), (1, 1))
+    result = runner.invoke(cli, ['--name', 'x', 'sync', '--retries', '7'])
+    assert result.output == ('name=x COMMANDLINE\n'
+                             'retries=7 dry_run=False COMMANDLINE DEFAULT\n')
+
+
+@pytest.mark.parametrize('name, content', [
+    ('bad.ini', '[main]\nname\n'),
+    ('bad.json', '{bad'),
+    ('list.json', '[1, 2]'),
+])
+def test_config_default_map_invalid_file(runner, tmpdir, name, content):
+    config = tmpdir.join(name)
+    config.write(content)
+
+    @click.command(context_settings={
+        'default_map': click.ConfigDefaultMap([str(config)])})
+    @click.option('--name')
+    def cli(name):
+        pass
+
+    result = runner.invoke(cli)
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert 'Could not open file %s' % config in result.output
+
+
+def test_config_default_map_unreadable_layer(runner, tmpdir):
+    @click.command(context_settings={
+        'default_map': click.ConfigDefaultMap([str(tmpdir)])})
+    @click.option('--name')
+    def cli(name):
+        pass
+
+    result = runner.invoke(cli)
+    assert result.exit_code == 1
+    assert isinstance(result.exception, SystemExit)
+    assert 'Could not open file %s' % tmpdir in result.output
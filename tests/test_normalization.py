@@ -37,3 +37,26 @@ def test_command_normalization(runner):
 
     result = runner.invoke(cli, ['FOO'])
     assert result.output == 'here!\n'
+
+
+def test_normalization_memoized(runner):
+    calls = []
+
+    def normalize(token):
+        calls.append(token)
+        return token.lower()
+
+    @click.group(context_settings=dict(token_normalize_func=normalize))
+    @click.option('--name')
+    def cli(name):
+        pass
+
+    @cli.command()
+    @click.option('--choice', type=click.Choice(['a', 'b']))
+    def sub(choice):
+        click.echo(choice)
+
+    for _ in range(3):
+        result = runner.invoke(cli, ['--NAME', 'x', 'SUB', '--choice', 'A'])
+        assert result.output == 'a\n'
+    assert sorted(calls) == sorted(set(calls))
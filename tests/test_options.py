@@ -262,6 +262,54 @@ def test_show_envvar_auto_prefix(runner):
     assert 'TEST_ARG1' in result.output
 
 
+def test_auto_envvar_snapshot(runner, monkeypatch):
+    @click.group(chain=True)
+    @click.option('--debug', is_flag=True)
+    def cli(debug):
+        click.echo('debug=%s' % debug)
+        os.environ['TEST_SUB_NAME'] = 'late'
+
+    @cli.command()
+    @click.option('--name', envvar='NAME')
+    @click.option('--count', type=int, allow_from_autoenv=False)
+    @click.pass_context
+    def sub(ctx, name, count):
+        click.echo('name=%s count=%s' % (name, count))
+        assert ctx.get_auto_envvars() == {'NAME': 'sub', 'COUNT': '1'}
+
+    monkeypatch.delenv('TEST_SUB_NAME', raising=False)
+    result = runner.invoke(cli, ['sub'], auto_envvar_prefix='TEST',
+                           env={'TEST_DEBUG': '1', 'TEST_SUB_NAME': 'sub',
+                                'TEST_SUB_COUNT': '1'})
+    assert not result.exception
+    assert result.output == 'debug=True\nname=sub count=None\n'
+
+    closed = []
+
+    class Secret(click.Command):
+        def collect_envvars(self, ctx):
+            ctx.call_on_close(lambda: closed.append(ctx.info_name))
+            return click.Command.collect_envvars(self, ctx)
+
+    @cli.command(cls=Secret, hidden=True)
+    @click.option('--token')
+    def secret(token):
+        pass
+
+    ctx = click.Context(cli, info_name='cli', auto_envvar_prefix='TEST')
+    assert [(envvar, ctx.command_path, param.name) for envvar, ctx, param
+            in cli.collect_envvars(ctx)] == [
+        ('TEST_DEBUG', 'cli', 'debug'),
+        ('TEST_HELP', 'cli', 'help'),
+        ('TEST_SECRET_TOKEN', 'cli secret', 'token'),
+        ('TEST_SECRET_HELP', 'cli secret', 'help'),
+        ('NAME', 'cli sub', 'name'),
+        ('TEST_SUB_NAME', 'cli sub', 'name'),
+        ('TEST_SUB_HELP', 'cli sub', 'help'),
+    ]
+    assert closed == ['secret']
+
+
 def test_custom_validation(runner):
     def validate_pos_int(ctx, param, value):
         if value < 0:
@@ -357,6 +405,48 @@ def test_case_insensitive_choice(runner):
     assert result.exit_code == 0
 
 
+def test_large_choice_list(runner):
+    choices = ['Item%05d' % x for x in range(5000)]
+
+    @click.command(context_settings=dict(
+        token_normalize_func=lambda x: x.replace('_', '')))
+    @click.option('--item', multiple=True, type=click.Choice(
+        choices, case_sensitive=False))
+    def cmd(item):
+        click.echo(len(item))
+        click.echo(item[-1])
+
+    args = []
+    for x in range(0, 5000, 2):
+        args.extend(['--item', 'item_%05d' % x])
+    result = runner.invoke(cmd, args)
+    assert result.exit_code == 0
+    assert result.output == '2500\nitem04998\n'
+
+    result = runner.invoke(cmd, ['--item', 'Item05000'])
+    assert result.exit_code == 2
+    assert 'invalid choice: Item05000.' in result.output
+
+
+def test_choice_lookup_tracks_choices():
+    choice = click.Choice(['a', 'b'])
+    assert choice.convert('a', None, None) == 'a'
+    choice.choices = ['c']
+    assert choice.convert('c', None, None) == 'c'
+    with pytest.raises(click.BadParameter):
+        choice.convert('a', None, None)
+
+
+def test_choice_copies_choices():
+    choices = ['a', 'b']
+    choice = click.Choice(choices)
+    assert choice.convert('a', None, None) == 'a'
+    choices.append('c')
+    assert choice.choices == ('a', 'b')
+    with pytest.raises(click.BadParameter):
+        choice.convert('c', None, None)
+
+
 def test_multiline_help(runner):
     @click.command()
     @click.option('--foo', help="""
@@ -487,3 +577,239 @@ def test_option_names(runner, option_args, expected):
         if form.startswith('-'):
             result = runner.invoke(cmd, [form])
             assert result.output == 'True\n'
+
+
+def test_cached_conversions(runner):
+    calls = []
+
+    class Tag(click.ParamType):
+        name = 'tag'
+        pure = True
+
+        def convert(self, value, param, ctx):
+            calls.append(value)
+            return value.upper()
+
+    @click.command(context_settings=dict(cache_conversions=True))
+    @click.option('--tag', multiple=True, type=Tag())
+    @click.option('-n', multiple=True, type=click.IntRange(0, 5))
+    def cli(tag, n):
+        click.echo(' '.join(tag))
+        click.echo(sum(n))
+
+    args = ['--tag', 'a', '--tag', 'b', '--tag', 'a', '-n', '1', '-n', '1']
+    result = runner.invoke(cli, args)
+    assert not result.exception
+    assert result.output == 'A B A\n2\n'
+    assert calls == ['a', 'b']
+
+    result = runner.invoke(cli, ['-n', '1', '-n', '9', '-n', '9'])
+    assert result.exit_code == 2
+    assert '9 is not in the valid range of 0 to 5.' in result.output
+
+
+def test_impure_conversions_not_cached(runner):
+    calls = []
+
+    class Tag(click.ParamType):
+        name = 'tag'
+
+        def convert(self, value, param, ctx):
+            calls.append(value)
+            return value
+
+    @click.command(context_settings=dict(cache_conversions=True))
+    @click.option('--tag', multiple=True, type=Tag())
+    def cli(tag):
+        pass
+
+    result = runner.invoke(cli, ['--tag', 'a', '--tag', 'a'])
+    assert not result.exception
+    assert calls == ['a', 'a']
+
+
+def test_multiple_float_range_nan():
+    ty = click.FloatRange(0, 1)
+    with pytest.raises(click.BadParameter):
+        ty.convert_many(['nan', '-1', '0.5'])
+    assert ty.convert_many(['0.5', '1']) == (0.5, 1.0)
+
+
+def test_multiple_subclassed_number_types(runner):
+    class Hex(click.types.IntParamType):
+        def convert(self, value, param, ctx):
+            return int(value, 16)
+
+    class Percent(click.FloatRange):
+        def convert(self, value, param, ctx):
+            return click.FloatRange.convert(
+                self, value.rstrip('%'), param, ctx) / 100
+
+    @click.command()
+    @click.option('--x', type=Hex())
+    @click.option('--p', multiple=True, type=Percent(0, 100))
+    @click.argument('y', nargs=-1, type=Hex())
+    def cli(x, p, y):
+        click.echo('%r %r %r' % (x, p, y))
+
+    result = runner.invoke(cli, ['--x', '10', '--p', '50%', '--p', '25',
+                                 '10', '20'])
+    assert not result.exception
+    assert result.output == '16 (0.5, 0.25) (16, 32)\n'
+
+
+def test_multiple_nargs_as_array(runner):
+    numpy = pytest.importorskip('numpy')
+
+    @click.command()
+    @click.option('--point', nargs=2, multiple=True, type=int, as_array=True)
+    @click.option('--n', multiple=True, type=click.IntRange(0, 5),
+                  as_array=True, required=True)
+    def cli(point, n):
+        assert point.dtype == numpy.int64
+        click.echo(repr(point.tolist()))
+        click.echo(n.sum())
+
+    result = runner.invoke(cli, ['--point', '1', '2', '--point', '3', '4',
+                                 '--n', '5', '--n', '4'])
+    assert not result.exception
+    assert result.output == '[[1, 2], [3, 4]]\n9\n'
+
+    result = runner.invoke(cli, ['--n', '6'])
+    assert result.exit_code == 2
+    assert '6 is bigger than' not in result.output
+    assert '6 is not in the valid range of 0 to 5.' in result.output
+
+    result = runner.invoke(cli, [])
+    assert result.exit_code == 2
+    assert 'Missing option "--n"' in result.output
+
+
+def test_deferred_options(runner):
+    calls = []
+
+    def expensive():
+        calls.append('default')
+        return 42
+
+    @click.command()
+    @click.option('--number', type=int, default=expensive, deferred=True)
+    @click.option('--other', type=int, deferred=True)
+    @click.option('--eager', type=int, default=1, deferred=True,
+                  is_eager=True)
+    def cli(number, other, eager):
+        assert eager == 1
+        assert isinstance(number, click.DeferredValue)
+        assert not number.is_resolved
+        if other.get() is not None:
+            assert calls == []
+            click.echo(other.get() + 1)
+        else:
+            click.echo(number.get())
+            click.echo(number.get())
+        click.echo(calls)
+
+    result = runner.invoke(cli, ['--other', '1'])
+    assert not result.exception
+    assert result.output == '2\n[]\n'
+
+    result = runner.invoke(cli, [])
+    assert not result.exception
+    assert result.output == "42\n42\n['default']\n"
+
+    result = runner.invoke(cli, ['--other', 'x'])
+    assert result.exit_code == 2
+    assert 'Invalid value for "--other": x is not a valid integer' \
+        in result.output
+
+
+def test_callable_default_called_once(runner):
+    calls = []
+
+    def default():
+        calls.append(None)
+        return 'x'
+
+    @click.command()
+    @click.option('--value', default=default)
+    @click.pass_context
+    def cli(ctx, value):
+        param = ctx.command.params[0]
+        assert param.get_default(ctx) == value
+        click.echo(len(calls))
+
+    result = runner.invoke(cli, [])
+    assert result.output == '1\n'
+    result = runner.invoke(cli, [])
+    assert result.output == '2\n'
+
+
+def test_cached_default(runner, tmpdir):
+    calls = []
+    path = str(tmpdir.join('cache', 'value.json'))
+
+    def slow():
+        calls.append(None)
+        return len(calls)
+
+    default = click.cached_default(slow, ttl=60, path=path, label='slow')
+
+    @click.command()
+    @click.option('--value', type=int, default=default, show_default=True)
+    def cli(value):
+        click.echo(value)
+
+    result = runner.invoke(cli, ['--help'])
+    assert '[default: (slow)]' in result.output
+    assert calls == []
+
+    assert runner.invoke(cli, []).output == '1\n'
+    assert runner.invoke(cli, []).output == '1\n'
+    assert calls == [None]
+
+    # Another process reads the value from disk.
+    other = click.cached_default(slow, path=path)
+    assert other() == 1
+    other.invalidate()
+    assert other() == 2
+
+    expired = click.cached_default(ttl=0)(slow)
+    assert expired() == 3
+    assert expired() == 4
+
+
+def test_abbreviated_long_options(runner):
+    @click.command(context_settings={'allow_abbreviations': True})
+    @click.option('--verbose', is_flag=True)
+    @click.option('--version-file')
+    @click.option('--color/--no-color', '--colour', default=None)
+    def cli(verbose, version_file, color):
+        click.echo('%s %s %s' % (verbose, version_file, color))
+
+    result = runner.invoke(cli, ['--verb', '--version-f=x', '--col'])
+    assert result.output == 'True x True\n'
+    assert runner.invoke(cli, ['--no']).output == 'False None False\n'
+
+    result = runner.invoke(cli, ['--ver'])
+    assert result.exit_code == 2
+    assert '(Possible options: --verbose, --version-file)' in result.output
+
+    plain = click.Command('plain', params=cli.params, callback=cli.callback)
+    result = runner.invoke(plain, ['--verb'])
+    assert 'Did you mean --verbose?' in result.output
+
+
+def test_abbreviations_keep_short_options(runner):
+    @click.command(context_settings={'allow_abbreviations': True})
+    @click.option('-v', 'v', is_flag=True)
+    @click.option('-verbose', 'verbose', is_flag=True)
+    @click.option('-x', 'x', is_flag=True)
+    def cli(v, verbose, x):
+        click.echo('v=%s verbose=%s x=%s' % (v, verbose, x))
+
+    assert runner.invoke(cli, ['-v']).output == \
+        'v=True verbose=False x=False\n'
+    assert runner.invoke(cli, ['-verb']).output == \
+        'v=False verbose=True x=False\n'
+    assert runner.invoke(cli, ['-vx']).output == \
+        'v=True verbose=False x=True\n'
@@ -1,3 +1,4 @@
+import io
 import os
 import sys
 
@@ -285,6 +286,116 @@ def test_open_file(runner):
         assert result.output == 'foobar\nmeep\n'
 
 
+@pytest.mark.skipif(PY2, reason='bz2 and xz need Python 3')
+@pytest.mark.parametrize('ext', ['.gz', '.bz2', '.xz'])
+def test_open_file_compression(tmpdir, ext):
+    filename = str(tmpdir.join('data' + ext))
+    with click.open_file(filename, 'w', compression='auto',
+                         atomic=True) as f:
+        f.write(u'hello\nworld\n')
+    with open(filename, 'rb') as f:
+        assert not f.read().startswith(b'hello')
+
+    with click.open_file(filename, compression='auto') as f:
+        assert list(f) == [u'hello\n', u'world\n']
+
+    plain = str(tmpdir.join('plain.gz'))
+    with open(plain, 'w') as f:
+        f.write('not compressed')
+    with click.open_file(plain, compression='auto') as f:
+        assert f.read() == 'not compressed'
+
+
+@pytest.mark.skipif(PY2, reason='bz2 needs Python 3')
+@pytest.mark.parametrize('content', [b'BZh is not bz2', b'BZh9 is not bz2',
+                                     b'\x1f\x8b\x08 not gzip'])
+def test_open_file_compression_lookalike(tmpdir, content):
+    filename = str(tmpdir.join('data.txt'))
+    with open(filename, 'wb') as f:
+        f.write(content)
+    with click.open_file(filename, 'rb', compression='auto') as f:
+        assert f.read() == content
+
+
+def test_copy_stream_files(tmpdir):
+    data = os.urandom(100000)
+    src = tmpdir.join('src')
+    src.write_binary(data)
+    dst = str(tmpdir.join('dst'))
+    progress = []
+
+    with open(str(src), 'rb') as f, click.open_file(dst, 'wb') as out:
+        assert f.read(10) == data[:10]
+        assert click.copy_stream(f, out, progress=progress.append) \
+            == len(data) - 10
+        assert f.tell() == len(data)
+        out.write(b'end')
+
+    assert sum(progress) == len(data) - 10
+    with open(dst, 'rb') as f:
+        assert f.read() == data[10:] + b'end'
+
+    with open(str(src), 'rb') as f, open(dst, 'wb') as out:
+        assert click.copy_stream(f, out, length=1000) == 1000
+        assert f.read(5) == data[1000:1005]
+    with open(dst, 'rb') as f:
+        assert f.read() == data[:1000]
+
+
+def test_copy_stream_fallback(runner):
+    @click.command()
+    @click.argument('src', type=click.File('rb'))
+    @click.argument('dst', type=click.File('wb'))
+    def cli(src, dst):
+        with click.progressbar(length=11, file=io.StringIO()) as bar:
+            click.copy_stream(src, dst, buffer_size=4, progress=bar)
+            assert bar.pos == 11
+
+    result = runner.invoke(cli, ['-', '-'], input=b'hello world')
+    assert not result.exception
+    assert result.output == 'hello world'
+
+    src = io.BytesIO(b'abcdef')
+    dst = io.BytesIO()
+    assert click.copy_stream(src, dst, length=4, buffer_size=3) == 4
+    assert dst.getvalue() == b'abcd'
+
+
+def test_open_file_prefetch(tmpdir):
+    data = os.urandom(100000)
+    filename = str(tmpdir.join('data.bin'))
+    with open(filename, 'wb') as f:
+        f.write(data)
+
+    with click.open_file(filename, 'rb', prefetch=4, buffering=1000) as f:
+        assert f.name == filename
+        assert f.read(10) == data[:10]
+        assert f.read() == data[10:]
+
+    # Closing before everything was read stops the reading thread.
+    with click.open_file(filename, 'rb', prefetch=1, buffering=10) as f:
+        assert f.read(5) == data[:5]
+    assert f.closed
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 1024])
+def test_iter_line_chunks(chunk_size):
+    data = u'\xe4\nbc\n\nd\u20ac\nlast'.encode('utf-8')
+
+    chunks = list(click.iter_line_chunks(io.BytesIO(data), chunk_size,
+                                         encoding='utf-8'))
+    assert all(chunks)
+    assert sum(chunks, []) == [u'\xe4', u'bc', u'', u'd\u20ac', u'last']
+
+    lines = sum(click.iter_line_chunks(io.BytesIO(data), chunk_size,
+                                       keepends=True), [])
+    assert b''.join(lines) == data
+    assert lines[0] == u'\xe4\n'.encode('utf-8')
+
+    text = io.TextIOWrapper(io.BytesIO(b'a\r\nb\n'), 'ascii')
+    assert sum(click.iter_line_chunks(text, chunk_size), []) == [u'a', u'b']
+
+
 @pytest.mark.xfail(WIN and not PY2, reason='God knows ...')
 def test_iter_keepopenfile(tmpdir):
     expected = list(map(str, range(10)))